@@ -0,0 +1,99 @@
+"""Fingerprinted static assets built by build_static.py"""
+import json
+import os
+from mimetypes import guess_type
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from compression import accepted_values
+
+STATIC_DIR = "static"
+STATIC_URL = "/static/"
+# build_static.py writes fingerprinted files and the manifest under static/dist
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Best first; a variant is only built when it is smaller than the original
+IMAGE_VARIANTS = [("avif", "image/avif"), ("webp", "image/webp")]
+ENCODINGS = [("br", "br"), ("gzip", "gz")]
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unfingerprinted files may change in place, so clients revalidate them
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+def load_manifest(static_dir: str = STATIC_DIR) -> dict:
+    """Logical name -> build entry, or {} when the assets have not been built"""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {}
+
+def make_asset_url(manifest: dict):
+    """Jinja global resolving a logical name like "books.png" to its fingerprinted URL"""
+    def asset_url(name: str) -> str:
+        entry = manifest.get(name)
+        if entry is None:
+            return STATIC_URL + name
+        return f"{STATIC_URL}{DIST_DIR}/{entry['file']}"
+    return asset_url
+
+class AssetFiles(StaticFiles):
+    """StaticFiles with immutable caching and variant negotiation for built assets.
+
+    A fingerprinted image is answered with its AVIF or WebP variant when
+    the client's Accept header names that type, and a text asset with its
+    precompressed .br or .gz file per Accept-Encoding.
+    """
+
+    def __init__(self, *args, manifest: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = {
+            os.path.join(DIST_DIR, entry["file"]): entry
+            for entry in (manifest or {}).values()
+        }
+
+    def _candidates(self, path: str, entry: dict, headers: Headers):
+        """(variant path, Content-Encoding) pairs the client accepts, best first"""
+        accept = accepted_values(headers.get("accept", ""))
+        for variant, media_type in IMAGE_VARIANTS:
+            if variant in entry.get("variants", ()) and media_type in accept:
+                yield f"{path}.{variant}", None
+        accept_encoding = accepted_values(headers.get("accept-encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding in entry.get("encodings", ()) and encoding in accept_encoding:
+                yield f"{path}.{suffix}", encoding
+
+    async def get_response(self, path: str, scope: Scope):
+        entry = self.assets.get(path)
+        if entry is None:
+            response = await super().get_response(path, scope)
+            if response.status_code in (200, 304):
+                response.headers.setdefault("Cache-Control", REVALIDATE_CACHE_CONTROL)
+            return response
+
+        response = None
+        for variant, encoding in self._candidates(path, entry, Headers(scope=scope)):
+            try:
+                response = await super().get_response(variant, scope)
+                break
+            except HTTPException:
+                # Missing from disk; try the next variant, then the original
+                continue
+        if response is None:
+            encoding = None
+            response = await super().get_response(path, scope)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        if entry.get("variants"):
+            response.headers.add_vary_header("Accept")
+        if entry.get("encodings"):
+            response.headers.add_vary_header("Accept-Encoding")
+        if encoding is not None and response.status_code == 200:
+            response.headers["Content-Encoding"] = encoding
+            media_type = guess_type(path)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            response.headers["Content-Type"] = media_type
+        return response
@@ -0,0 +1,72 @@
+"""Bearer token for the dashboard's calls to the backend API.
+
+The backend only issues access tokens that expire after
+ACCESS_TOKEN_EXPIRE_MINUTES, so with a service account
+(VSIMPLIFY_API_EMAIL/VSIMPLIFY_API_PASSWORD) the token is fetched from
+/auth/login and fetched again shortly before it expires or once the
+backend rejects it. A fixed VSIMPLIFY_API_TOKEN is used as given.
+"""
+import base64
+import json
+import logging
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+logger = logging.getLogger("dashboard.backend")
+
+# A token this close to its expiry is replaced before use
+REFRESH_MARGIN_SECONDS = 60
+
+def _token_expiry(token):
+    """exp claim of a JWT, read without verifying it, or None"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+class BackendToken:
+    def __init__(self, url, token=None, email=None, password=None):
+        self.url = url
+        self.email = email
+        self.password = password
+        self._token = token
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Current token, logging in again when it is missing or about to expire"""
+        with self._lock:
+            if self._token is not None:
+                expiry = _token_expiry(self._token)
+                if expiry is None or expiry - time.time() > REFRESH_MARGIN_SECONDS:
+                    return self._token
+            if not (self.email and self.password):
+                # Nothing to renew it with; the backend will say if it has expired
+                return self._token
+            self._token = self._login()
+            return self._token
+
+    def invalidate(self, token):
+        """Drop a token the backend refused; True when a new one can be fetched"""
+        with self._lock:
+            if not (self.email and self.password):
+                return False
+            if self._token == token:
+                self._token = None
+            return True
+
+    def _login(self):
+        request = urllib.request.Request(
+            f"{self.url.rstrip('/')}/auth/login",
+            data=urllib.parse.urlencode({"username": self.email, "password": self.password}).encode(),
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            token = json.load(response).get("access_token")
+        if not token:
+            raise ValueError("Login response carries no access_token")
+        logger.info("logged in to %s as %s", self.url, self.email)
+        return token
@@ -0,0 +1,58 @@
+"""Render benchmark for the dashboard pages: python bench_pages.py [--requests N]
+
+Times loading every template into a fresh Jinja Environment, with and
+without a warm bytecode cache, then requests each page through the app
+and reports ms/render and bytes on the wire for identity, gzip and (when
+the brotli package is installed) br. Without API_URL the pages render
+the sample data, so no backend is needed.
+
+Recorded figures are in vsimplify_backend/bench/RESULTS.txt.
+"""
+import argparse
+import tempfile
+import time
+from fastapi.testclient import TestClient
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from compression import brotli
+from main import app, templates
+
+PAGES = ["/", "/customer/1", "/suppliers", "/dashboard", "/transactions", "/accountant/dashboard"]
+
+def _load_ms(bytecode_cache=None):
+    environment = Environment(loader=FileSystemLoader("templates"), bytecode_cache=bytecode_cache)
+    # The app's filters and globals, which the templates are compiled against
+    environment.filters.update(templates.env.filters)
+    environment.globals.update(templates.env.globals)
+    names = [name for name in environment.list_templates() if name.endswith(".html")]
+    start = time.perf_counter()
+    for name in names:
+        environment.get_template(name)
+    return len(names), (time.perf_counter() - start) * 1000
+
+def _page(client, path, encoding, requests):
+    response = client.get(path, headers={"Accept-Encoding": encoding})
+    response.raise_for_status()
+    size = len(response.content) if encoding == "identity" else int(response.headers["content-length"])
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers={"Accept-Encoding": encoding})
+    return (time.perf_counter() - start) * 1000 / requests, size
+
+def main(requests: int):
+    with tempfile.TemporaryDirectory() as directory:
+        count, cold_ms = _load_ms(FileSystemBytecodeCache(directory))
+        _, warm_ms = _load_ms(FileSystemBytecodeCache(directory))
+    print(f"loading {count} templates: {cold_ms:.0f} ms compiled, {warm_ms:.0f} ms from the bytecode cache")
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    print(f"{'page':<24}" + "".join(f"{e + ' ms':>12}{e + ' B':>12}" for e in encodings))
+    with TestClient(app) as client:
+        for path in PAGES:
+            cells = [_page(client, path, encoding, requests) for encoding in encodings]
+            print(f"{path:<24}" + "".join(f"{ms:>12.1f}{size:>12}" for ms, size in cells))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure template load time, ms/render and bytes on the wire per page")
+    parser.add_argument("--requests", type=int, default=50, help="requests per page and encoding")
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,140 @@
+"""Build fingerprinted static assets: python build_static.py [--clean]
+
+Every file under static/ is copied to static/dist/ as name.<hash>.ext,
+where hash is taken from its content, so the URL changes whenever the
+bytes do and can be cached forever. Next to each copy it writes
+
+    name.<hash>.ext.br / .gz         text assets, when smaller
+    name.<hash>.ext.avif / .webp     PNG and JPEG images, when smaller
+
+and static/dist/manifest.json, which maps logical names to all of these.
+Brotli needs the brotli package and AVIF/WebP need Pillow (AVIF from
+Pillow 11.2, or the pillow-avif-plugin); missing ones are skipped.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+from assets import DIST_DIR, ENCODINGS, IMAGE_VARIANTS, MANIFEST_NAME, STATIC_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+    try:
+        import pillow_avif  # noqa: F401  registers AVIF on older Pillow
+    except ImportError:
+        pass
+except ImportError:
+    Image = None
+
+HASH_LENGTH = 12
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".svg", ".txt", ".html", ".xml", ".map"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+IMAGE_SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+def fingerprint(name: str, data: bytes) -> str:
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{extension}"
+
+def _compress(encoding: str, data: bytes):
+    if encoding == "br":
+        return brotli.compress(data, quality=11) if brotli is not None else None
+    # mtime=0 keeps the output reproducible
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def _convert(source_path: str, variant: str):
+    if Image is None:
+        return None
+    options = dict(IMAGE_SAVE_OPTIONS[variant])
+    image_format = options.pop("format")
+    Image.init()
+    if image_format not in Image.SAVE:
+        return None
+    buffer = io.BytesIO()
+    with Image.open(source_path) as image:
+        image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+def _write(path: str, data: bytes):
+    # Unchanged content means an unchanged file, so an existing one is left alone
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+def build(static_dir: str = STATIC_DIR, clean: bool = False) -> dict:
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+    written = {MANIFEST_NAME}
+
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(static_dir) and DIST_DIR in dirs:
+            dirs.remove(DIST_DIR)
+        for file_name in sorted(files):
+            source_path = os.path.join(root, file_name)
+            name = os.path.relpath(source_path, static_dir).replace(os.sep, "/")
+            extension = os.path.splitext(name)[1].lower()
+            with open(source_path, "rb") as file:
+                data = file.read()
+
+            target = fingerprint(name, data)
+            target_path = os.path.join(dist_dir, target)
+            _write(target_path, data)
+            written.add(target)
+            entry = {"file": target, "size": len(data), "variants": [], "encodings": []}
+
+            if extension in COMPRESSIBLE_EXTENSIONS:
+                for encoding, suffix in ENCODINGS:
+                    encoded = _compress(encoding, data)
+                    if encoded is not None and len(encoded) < len(data):
+                        _write(f"{target_path}.{suffix}", encoded)
+                        written.add(f"{target}.{suffix}")
+                        entry["encodings"].append(encoding)
+            elif extension in IMAGE_EXTENSIONS:
+                for variant, _ in IMAGE_VARIANTS:
+                    converted = _convert(source_path, variant)
+                    if converted is not None and len(converted) < len(data):
+                        _write(f"{target_path}.{variant}", converted)
+                        written.add(f"{target}.{variant}")
+                        entry["variants"].append(variant)
+            manifest[name] = entry
+
+    os.makedirs(dist_dir, exist_ok=True)
+    tmp_path = os.path.join(dist_dir, f"{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(dist_dir, MANIFEST_NAME))
+
+    if clean:
+        # Pages cached before a deploy may still ask for old fingerprints,
+        # so this is opt-in
+        for root, _, files in os.walk(dist_dir):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                if os.path.relpath(path, dist_dir).replace(os.sep, "/") not in written:
+                    os.remove(path)
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    parser.add_argument("--clean", action="store_true", help="remove files from earlier builds")
+    args = parser.parse_args()
+
+    for name, entry in sorted(build(args.static_dir, args.clean).items()):
+        extras = entry["variants"] + entry["encodings"]
+        print(f"{name} -> {DIST_DIR}/{entry['file']}" + (f" (+{', '.join(extras)})" if extras else ""))
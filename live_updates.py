@@ -0,0 +1,121 @@
+"""Relay of the backend's /events/stream to dashboard browsers.
+
+One thread per process reads the backend stream with the API token, so
+the token never reaches the browser, and every frame it reads is queued
+to each /api/events client. A client that falls behind loses its
+backlog and gets a single resync event, which makes the page refetch
+/api/dashboard-data. A refused token is renewed before reconnecting.
+"""
+import asyncio
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+
+logger = logging.getLogger("dashboard.events")
+
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+RETRY_FRAME = b"retry: 5000\n\n"
+HEARTBEAT_FRAME = b": keepalive\n\n"
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 32
+
+# Seconds between attempts to reopen the backend stream
+RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+# The backend sends a keepalive every 15 seconds, so a longer silence
+# means the connection is gone
+READ_TIMEOUT_SECONDS = 45
+
+class EventRelay:
+    def __init__(self, url, token, max_clients, on_change=None):
+        self.url = url
+        # A backend_auth.BackendToken
+        self.token = token
+        self.max_clients = max_clients
+        self.on_change = on_change
+        self.subscribers = set()
+        self._loop = None
+        self._thread = None
+
+    def is_full(self):
+        return len(self.subscribers) >= self.max_clients
+
+    def subscribe(self):
+        if self.url and (self._thread is None or not self._thread.is_alive()):
+            self._loop = asyncio.get_running_loop()
+            self._thread = threading.Thread(target=self._read_backend, name="event-relay", daemon=True)
+            self._thread.start()
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, frame):
+        if self.on_change is not None:
+            self.on_change()
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+
+    async def stream(self):
+        """SSE bytes for one browser, with a heartbeat to keep proxies from closing it"""
+        # Subscribed only once the response starts, so the finally below always runs
+        queue = self.subscribe()
+        try:
+            yield RETRY_FRAME
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+        finally:
+            self.unsubscribe(queue)
+
+    def _read_backend(self):
+        attempt = 0
+        reconnecting = False
+        while True:
+            token = None
+            try:
+                token = self.token.get()
+                request = urllib.request.Request(
+                    f"{self.url.rstrip('/')}/events/stream",
+                    headers={"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+                )
+                with urllib.request.urlopen(request, timeout=READ_TIMEOUT_SECONDS) as response:
+                    attempt = 0
+                    if reconnecting:
+                        # Changes made while disconnected were never relayed
+                        self._loop.call_soon_threadsafe(self.publish, RESYNC_FRAME)
+                    reconnecting = True
+                    lines = []
+                    for line in response:
+                        if line.strip():
+                            lines.append(line.rstrip(b"\r\n"))
+                            continue
+                        # Comments and the retry hint are not forwarded
+                        if any(item.startswith(b"data:") for item in lines):
+                            frame = b"\n".join(lines) + b"\n\n"
+                            self._loop.call_soon_threadsafe(self.publish, frame)
+                        lines = []
+            except RuntimeError:
+                # The event loop has closed; the next subscriber starts a new thread
+                return
+            except urllib.error.HTTPError as e:
+                if e.code == 401 and self.token.invalidate(token):
+                    logger.warning("event stream token refused, logging in again")
+                else:
+                    logger.warning("event stream from %s failed: %s", self.url, e)
+            except (OSError, ValueError) as e:
+                logger.warning("event stream from %s failed: %s", self.url, e)
+            if self._loop.is_closed():
+                return
+            time.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+            attempt += 1
@@ -1,9 +1,19 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
+from jinja2 import FileSystemBytecodeCache
 from datetime import datetime
+import asyncio
+import json
+import logging
 import os
+import time
+import urllib.error
+import urllib.request
+from assets import AssetFiles, load_manifest, make_asset_url
+from backend_auth import BackendToken
+from compression import CompressionMiddleware
+from live_updates import EventRelay
 
 # Create FastAPI instance
 app = FastAPI(
@@ -12,11 +22,25 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Pages and API responses of a kilobyte or more go out brotli/gzip encoded
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")))
+
 # Mount static files (CSS, JS, Images)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Assets fingerprinted by build_static.py are cached as immutable; before
+# a build, asset_url() falls back to the plain /static/ paths
+ASSET_MANIFEST = load_manifest()
+app.mount("/static", AssetFiles(directory="static", manifest=ASSET_MANIFEST), name="static")
 
 # Setup Jinja2 templates
-templates = Jinja2Templates(directory="templates")
+# Compiled templates are kept on disk so workers don't recompile them at
+# startup; without TEMPLATE_CACHE_DIR, Jinja picks a per-user temp directory
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+if TEMPLATE_CACHE_DIR:
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+templates = Jinja2Templates(
+    directory="templates",
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+)
 
 # Custom template filters and globals
 def format_currency(amount):
@@ -27,10 +51,16 @@ def format_number(number):
     """Format number with commas"""
     return f"{number:,}"
 
+def format_lakhs(amount):
+    """Format number as Indian currency in lakhs"""
+    return f"₹{amount / 100000:.1f}L"
+
 # Add custom functions to Jinja2 environment
 templates.env.filters["currency"] = format_currency
 templates.env.filters["number"] = format_number
+templates.env.filters["lakhs"] = format_lakhs
 templates.env.globals["now"] = datetime.now
+templates.env.globals["asset_url"] = make_asset_url(ASSET_MANIFEST)
 
 # Sample data (in production, this would come from database)
 SAMPLE_DATA = {
@@ -94,13 +124,69 @@ SAMPLE_DATA = {
     ]
 }
 
+# Live dashboard numbers come from the backend's /dashboard/snapshot;
+# without VSIMPLIFY_API_URL the sample data above is served instead.
+# Backend tokens expire, so give a service account to log in with
+# (VSIMPLIFY_API_EMAIL/VSIMPLIFY_API_PASSWORD) rather than a fixed token
+API_URL = os.getenv("VSIMPLIFY_API_URL")
+backend_token = BackendToken(
+    API_URL, os.getenv("VSIMPLIFY_API_TOKEN"), os.getenv("VSIMPLIFY_API_EMAIL"), os.getenv("VSIMPLIFY_API_PASSWORD")
+)
+SNAPSHOT_TTL_SECONDS = 5
+# Past this age a snapshot is no longer shown while the backend is unreachable
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "300"))
+_snapshot_cache = {"data": None, "expires": 0.0, "fetched": 0.0}
+logger = logging.getLogger("dashboard")
+
+def _fetch_snapshot():
+    for attempt in range(2):
+        token = backend_token.get()
+        request = urllib.request.Request(
+            f"{API_URL.rstrip('/')}/dashboard/snapshot",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=2) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            # An expired token is renewed and the fetch tried once more
+            if e.code != 401 or attempt or not backend_token.invalidate(token):
+                raise
+
+async def get_dashboard_snapshot():
+    """Backend dashboard snapshot, cached for a few seconds"""
+    if not API_URL:
+        return SAMPLE_DATA
+    
+    now = time.monotonic()
+    if now >= _snapshot_cache["expires"]:
+        try:
+            _snapshot_cache["data"] = await asyncio.to_thread(_fetch_snapshot)
+            _snapshot_cache["fetched"] = now
+        except (OSError, ValueError) as e:
+            # Keep serving the last good snapshot for a while
+            logger.warning("dashboard snapshot fetch from %s failed: %s", API_URL, e)
+        _snapshot_cache["expires"] = now + SNAPSHOT_TTL_SECONDS
+    if _snapshot_cache["data"] is None or now - _snapshot_cache["fetched"] > SNAPSHOT_MAX_AGE_SECONDS:
+        raise HTTPException(status_code=503, detail="Dashboard data is unavailable")
+    return _snapshot_cache["data"]
+
+def _expire_snapshot():
+    _snapshot_cache["expires"] = 0.0
+
+# Backend changes pushed to open dashboards; any change also drops the
+# cached snapshot so a resync refetch sees it
+event_relay = EventRelay(
+    API_URL, backend_token, int(os.getenv("EVENT_STREAM_MAX_CLIENTS", "5000")), on_change=_expire_snapshot
+)
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Redirect to dashboard"""
     return templates.TemplateResponse("index.html", {
         "request": request,
-        "data": SAMPLE_DATA
+        "data": await get_dashboard_snapshot()
     })
 
 @app.get("/dashboard", response_class=HTMLResponse)
@@ -108,7 +194,7 @@ async def dashboard(request: Request):
     """Main dashboard page"""
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
-        "data": SAMPLE_DATA,
+        "data": await get_dashboard_snapshot(),
         "page_title": "Financial Dashboard",
         "page_subtitle": "Real-time financial operations overview"
     })
@@ -312,16 +398,28 @@ async def accountant_profile(request: Request):
 @app.get("/api/dashboard-data")
 async def get_dashboard_data():
     """API endpoint to get dashboard data"""
-    return SAMPLE_DATA
+    return await get_dashboard_snapshot()
 
 @app.get("/api/transactions")
 async def get_transactions(limit: int = 10):
     """API endpoint to get recent transactions"""
+    data = await get_dashboard_snapshot()
     return {
-        "transactions": SAMPLE_DATA["recent_transactions"][:limit],
-        "total": len(SAMPLE_DATA["recent_transactions"])
+        "transactions": data["recent_transactions"][:limit],
+        "total": len(data["recent_transactions"])
     }
 
+@app.get("/api/events")
+async def get_events():
+    """Server-sent dashboard updates: counters, transactions and resync events"""
+    if event_relay.is_full():
+        raise HTTPException(status_code=503, detail="Too many open event streams")
+    return StreamingResponse(
+        event_relay.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
@@ -3,10 +3,62 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
+    # Defaults to database_url with the asyncpg driver
+    async_database_url: Optional[str] = None
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Connection pool, per engine and per worker process
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    
+    # Per-process cache of verified tokens and current users, entries are
+    # dropped on user updates in this process and expire after the TTL elsewhere
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_size: int = 10000
+    
+    # Changing the work factor rehashes each password on its next login
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    # Requests beyond this many waiting for a hash worker get a 503
+    password_hash_max_waiting: int = 200
+    
+    max_upload_size: int = 50 * 1024 * 1024
+    
+    # Rows per multi-row INSERT in the bulk ingestion endpoints
+    bulk_insert_batch_size: int = 1000
+    # Longer NDJSON lines are reported as errors rather than buffered
+    bulk_max_line_size: int = 1024 * 1024
+    
+    # Rows fetched per server-side cursor round trip in /export
+    export_batch_size: int = 1000
+    
+    # Monthly posting_payment_details partitions kept ready beyond the current month
+    payment_partition_months_ahead: int = 3
+    
+    # Document processing queue (python -m app.worker)
+    worker_processes: int = 2
+    worker_batch_size: int = 5
+    job_poll_interval: float = 1.0
+    job_max_attempts: int = 3
+    # A running job not finished within this many seconds is claimed again
+    job_visibility_timeout: int = 300
+    # First retry delay in seconds, doubled on each further attempt
+    job_retry_delay: int = 30
+    
+    # /events/stream, per worker process
+    event_stream_max_clients: int = 5000
+    # Frames buffered per client; a client that falls further behind is
+    # told to resync instead
+    event_stream_queue_size: int = 32
+    event_stream_heartbeat_seconds: float = 15.0
+    # Notifications arriving within this window are handled as one change
+    event_coalesce_seconds: float = 0.25
+    
     class Config:
         env_file = ".env"
 
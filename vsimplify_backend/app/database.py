@@ -1,11 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.utils.pool_stats import PoolStats, timed_pool_class, track_invalidations
 
-engine = create_engine(settings.database_url)
+pool_options = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+}
+
+engine = create_engine(
+    settings.database_url,
+    poolclass=timed_pool_class(QueuePool, PoolStats()),
+    **pool_options
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_database_url = settings.async_database_url or make_url(settings.database_url).set(
+    drivername="postgresql+asyncpg"
+)
+async_engine = create_async_engine(
+    async_database_url,
+    poolclass=timed_pool_class(AsyncAdaptedQueuePool, PoolStats()),
+    **pool_options
+)
+# Objects stay usable after commit, the routers return them straight after db.commit()
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+track_invalidations(engine, engine.pool.pool_stats)
+track_invalidations(async_engine.sync_engine, async_engine.pool.pool_stats)
+
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +46,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
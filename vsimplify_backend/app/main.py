@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, companies, users, documents, invoices, suppliers, payments
-from app.database import engine, Base
+from app.routers import auth, companies, users, documents, invoices, suppliers, payments, health, dashboard, export, search, links, events
+from app.config import settings
+from app.database import AsyncSessionLocal, engine, async_engine
+from app.utils.events import broadcaster
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.partitions import ensure_payment_partitions
+from app.utils.password_hasher import password_hasher
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema is managed by Alembic: run `alembic upgrade head` before starting
 
 app = FastAPI(
     title="VSimplify Clone API",
@@ -19,6 +23,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -29,6 +34,25 @@ app.include_router(documents.router)
 app.include_router(invoices.router)
 app.include_router(suppliers.router)
 app.include_router(payments.router)
+app.include_router(health.router)
+app.include_router(dashboard.router)
+app.include_router(export.router)
+app.include_router(search.router)
+app.include_router(links.router)
+app.include_router(events.router)
+
+@app.on_event("startup")
+async def create_upcoming_partitions():
+    async with AsyncSessionLocal() as db:
+        await ensure_payment_partitions(db, settings.payment_partition_months_ahead)
+        await db.commit()
+
+@app.on_event("shutdown")
+async def release_resources():
+    await broadcaster.stop()
+    await async_engine.dispose()
+    engine.dispose()
+    password_hasher.shutdown()
 
 @app.get("/")
 def read_root():
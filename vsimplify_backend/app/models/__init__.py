@@ -1,9 +1,11 @@
 from .user import User, UserRole
 from .company import Company, company_user_relation
-from .document import Document
-from .invoice import Invoice
+from .document import Document, DocumentBlob
+from .invoice import Invoice, InvoiceDetailEntry, InvoiceFact
 from .supplier import Supplier, company_supplier_relation
 from .payment import PostingPaymentDetails
+from .dashboard import DocumentStatusRollup, InvoiceCategoryRollup
+from .job import DocumentJob
 
 __all__ = [
     "User",
@@ -11,8 +13,14 @@ __all__ = [
     "Company",
     "company_user_relation",
     "Document",
+    "DocumentBlob",
     "Invoice", 
+    "InvoiceDetailEntry",
+    "InvoiceFact",
     "Supplier",
     "company_supplier_relation",
-    "PostingPaymentDetails"
+    "PostingPaymentDetails",
+    "DocumentStatusRollup",
+    "InvoiceCategoryRollup",
+    "DocumentJob"
 ]
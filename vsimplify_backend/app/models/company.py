@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Table
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Table, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -12,7 +12,9 @@ company_user_relation = Table(
     Column('id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
     Column('company_id', UUID(as_uuid=True), ForeignKey('company.id', ondelete='CASCADE')),
     Column('user_id', UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE')),
-    Column('created_at', DateTime(timezone=True), server_default=func.now())
+    Column('created_at', DateTime(timezone=True), server_default=func.now()),
+    Index('uq_company_user_relation_company_id_user_id', 'company_id', 'user_id', unique=True),
+    Index('ix_company_user_relation_user_id', 'user_id'),
 )
 
 class Company(Base):
@@ -32,6 +34,10 @@ class Company(Base):
     # Relationships
     users = relationship("User", secondary=company_user_relation, back_populates="companies")
 
+    __table_args__ = (
+        Index("ix_company_name_prefix", text('lower(name) COLLATE "C"')),
+    )
+
 # Add to User model
 from app.models.user import User
 User.companies = relationship("Company", secondary=company_user_relation, back_populates="users")
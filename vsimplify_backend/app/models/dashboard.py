@@ -0,0 +1,43 @@
+from sqlalchemy import Column, String, Date, DECIMAL, BigInteger, Index, text
+from app.database import Base
+
+class DocumentStatusRollup(Base):
+    """Document count per (upload month, type, status) for the dashboard.
+
+    Maintained by statement-level triggers on document (migration 0005),
+    so the dashboard reads a handful of rows however many documents exist.
+    upload_month is the first day of the UTC upload month.
+    """
+    __tablename__ = "document_status_rollup"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    upload_month = Column(Date)
+    doc_type = Column(String(100))
+    status = Column(String(50))
+    document_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "uq_document_status_rollup_key",
+            text("COALESCE(upload_month, DATE '0001-01-01')"),
+            text("COALESCE(doc_type, '')"),
+            text("COALESCE(status, '')"),
+            unique=True,
+        ),
+    )
+
+class InvoiceCategoryRollup(Base):
+    """Invoice count and total amount per category, from invoice_fact.
+
+    Maintained by statement-level triggers on invoice_fact (migration 0005).
+    """
+    __tablename__ = "invoice_category_rollup"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    category = Column(String(100))
+    invoice_count = Column(BigInteger, nullable=False, default=0)
+    total_amount = Column(DECIMAL(20, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index("uq_invoice_category_rollup_key", text("COALESCE(category, '')"), unique=True),
+    )
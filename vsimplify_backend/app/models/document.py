@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Text, BigInteger, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -14,8 +14,28 @@ class Document(Base):
     status = Column(String(50), default='pending')
     type = Column(String(100))
     party_name = Column(String(255))
+    content_hash = Column(String(64))
+    file_size = Column(BigInteger)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     invoices = relationship("Invoice", back_populates="document")
+
+    __table_args__ = (
+        Index("ix_document_upload_date_id", "upload_date", "id"),
+        Index("ix_document_status_upload_date_id", "status", "upload_date", "id"),
+        Index("ix_document_type_upload_date_id", "type", "upload_date", "id"),
+        Index("ix_document_party_name_prefix", text('lower(party_name) COLLATE "C"')),
+    )
+
+class DocumentBlob(Base):
+    """Content-addressed file shared by every document with the same bytes."""
+    __tablename__ = "document_blob"
+    
+    content_hash = Column(String(64), primary_key=True)
+    path = Column(Text, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
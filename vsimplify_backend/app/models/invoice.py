@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Index, Integer, Text, DECIMAL
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -18,3 +18,57 @@ class Invoice(Base):
     
     # Relationships
     document = relationship("Document", back_populates="invoices")
+
+    __table_args__ = (
+        Index("ix_invoice_created_date_id", "created_date", "id"),
+        Index("ix_invoice_category_created_date_id", "category", "created_date", "id"),
+        Index("ix_invoice_accounting_type_created_date_id", "accounting_type", "created_date", "id"),
+        Index("ix_invoice_doc_id", "doc_id"),
+    )
+
+class InvoiceDetailEntry(Base):
+    """One label/value pair of Invoice.invoice_details, kept for indexed search.
+
+    Rows are written by triggers on invoice (migration 0003), so every write
+    path stays in sync. Labels are stored lower-cased and trimmed; values
+    that read as a number also get numeric_value for range queries.
+    """
+    __tablename__ = "invoice_detail"
+    
+    invoice_id = Column(UUID(as_uuid=True), ForeignKey('invoice.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    label = Column(String(255), nullable=False)
+    # C collation keeps prefix searches on the btree index
+    value = Column(Text(collation="C"))
+    numeric_value = Column(DECIMAL(20, 4))
+
+    __table_args__ = (
+        Index("ix_invoice_detail_label_value", "label", "value"),
+        Index("ix_invoice_detail_label_numeric_value", "label", "numeric_value"),
+    )
+
+class InvoiceFact(Base):
+    """Typed header fields of an invoice, parsed from its invoice_details.
+
+    Maintained by triggers on invoice (migration 0004) from the
+    invoice_detail rows, so spend can be aggregated in SQL.
+    accounting_date is the invoice date, or the day it was recorded when
+    the details carry no parseable date.
+    """
+    __tablename__ = "invoice_fact"
+    
+    invoice_id = Column(UUID(as_uuid=True), ForeignKey('invoice.id', ondelete='CASCADE'), primary_key=True)
+    category = Column(String(100))
+    accounting_type = Column(String(100))
+    invoice_number = Column(String(100))
+    invoice_date = Column(Date)
+    accounting_date = Column(Date, nullable=False)
+    supplier_name = Column(String(255))
+    gstin = Column(String(50))
+    taxable_amount = Column(DECIMAL(18, 2))
+    tax_amount = Column(DECIMAL(18, 2))
+    total_amount = Column(DECIMAL(18, 2))
+
+    __table_args__ = (
+        Index("ix_invoice_fact_accounting_date", "accounting_date"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Text, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+class DocumentJob(Base):
+    """One processing stage of one document, claimed by app.worker.
+
+    due_at is when a queued job may next run, or when a running job's
+    lease (visibility timeout) expires and another worker may reclaim it.
+    payload carries the previous stage's output to the next stage.
+    """
+    __tablename__ = "document_job"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("document.id", ondelete="CASCADE"), nullable=False)
+    stage = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    payload = Column(JSONB)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    due_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String(100))
+    last_error = Column(Text)
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_document_job_due", "due_at", postgresql_where=text("status IN ('queued', 'running')")),
+        Index("ix_document_job_document_id", "document_id"),
+        Index("ix_document_job_stage_finished_at", "stage", "finished_at"),
+    )
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, DateTime, DECIMAL, Date, Text
+from sqlalchemy import Column, String, DateTime, DECIMAL, Date, Text, BigInteger, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
 
 class PostingPaymentDetails(Base):
+    """Range-partitioned by month of posting_date (migration 0009).
+
+    Postgres cannot enforce a primary key on id alone here, so id is the
+    ORM identity only and is backed by a plain index. app.utils.partitions
+    creates upcoming months and detaches archived ones.
+    """
     __tablename__ = "posting_payment_details"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -20,3 +26,41 @@ class PostingPaymentDetails(Base):
     doc_of_proof_url = Column(Text)
     created_date = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_posting_payment_details_created_date_id", "created_date", "id"),
+        Index("ix_posting_payment_details_mode_created_date_id", "payment_mode", "created_date", "id"),
+        Index("ix_posting_payment_details_source_created_date_id", "payment_source", "created_date", "id"),
+        Index("ix_posting_payment_details_posting_date", "posting_date"),
+        Index("ix_posting_payment_details_ref_no", "ref_no"),
+        Index("ix_posting_payment_details_id", "id"),
+        {"postgresql_partition_by": "RANGE (posting_date)"},
+    )
+
+class PaymentDailyRollup(Base):
+    """Payment count and sums per (posting_date, payment_mode, payment_source).
+
+    Maintained by statement-level triggers on posting_payment_details, so
+    every write path (ORM, bulk SQL, statement import) keeps it exact.
+    Empty mode/source strings are folded into NULL. The trigger function
+    and backfill live in migration 0001.
+    """
+    __tablename__ = "payment_daily_rollup"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    posting_date = Column(Date)
+    payment_mode = Column(String(50))
+    payment_source = Column(String(100))
+    payment_count = Column(BigInteger, nullable=False, default=0)
+    amount_paid = Column(DECIMAL(17, 2), nullable=False, default=0)
+    total_amount = Column(DECIMAL(17, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        Index(
+            "uq_payment_daily_rollup_key",
+            text("COALESCE(posting_date, DATE '0001-01-01')"),
+            text("COALESCE(payment_mode, '')"),
+            text("COALESCE(payment_source, '')"),
+            unique=True,
+        ),
+    )
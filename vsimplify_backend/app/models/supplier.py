@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Table
+from sqlalchemy import Column, String, DateTime, ForeignKey, Table, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -12,7 +12,9 @@ company_supplier_relation = Table(
     Column('id', UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
     Column('company_id', UUID(as_uuid=True), ForeignKey('company.id', ondelete='CASCADE')),
     Column('supplier_id', UUID(as_uuid=True), ForeignKey('supplier.id', ondelete='CASCADE')),
-    Column('created_at', DateTime(timezone=True), server_default=func.now())
+    Column('created_at', DateTime(timezone=True), server_default=func.now()),
+    Index('uq_company_supplier_relation_company_id_supplier_id', 'company_id', 'supplier_id', unique=True),
+    Index('ix_company_supplier_relation_supplier_id', 'supplier_id'),
 )
 
 class Supplier(Base):
@@ -30,3 +32,11 @@ class Supplier(Base):
     
     # Relationships
     companies = relationship("Company", secondary=company_supplier_relation)
+
+    __table_args__ = (
+        Index("ix_supplier_created_date_id", "created_date", "id"),
+        Index("ix_supplier_currency_type_created_date_id", "currency_type", "created_date", "id"),
+        Index("ix_supplier_gst_status_created_date_id", "gst_status", "created_date", "id"),
+        Index("ix_supplier_name_prefix", text('lower(name) COLLATE "C"')),
+        Index("ix_supplier_ledger_name_prefix", text('lower(ledger_name) COLLATE "C"')),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum
+from sqlalchemy import Column, String, DateTime, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -21,3 +21,8 @@ class User(Base):
     role = Column(Enum(UserRole), nullable=False)
     created_date = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_users_created_date_id", "created_date", "id"),
+        Index("ix_users_role_created_date_id", "role", "created_date", "id"),
+    )
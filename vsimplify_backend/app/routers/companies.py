@@ -1,62 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.company import Company, company_user_relation
 from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyResponse, CompanyUpdate, AssignAccountantRequest
-from app.utils.dependencies import get_current_user, require_owner
+from app.utils.dependencies import get_current_user, get_current_user_fresh, require_owner
+from app.utils.etag import list_etag, make_etag, not_modified
+from app.utils.links import missing_ids, sync_links
+from app.utils.responses import orm_json_response
 import uuid
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
 @router.post("/", response_model=CompanyResponse)
-def create_company(
+async def create_company(
     company: CompanyCreate, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user: User = Depends(require_owner)
 ):
     db_company = Company(**company.dict())
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
     return db_company
 
 @router.get("/", response_model=List[CompanyResponse])
-def get_companies(
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+async def get_companies(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db), 
+    current_user: User = Depends(get_current_user_fresh)
 ):
     if current_user.role == "OWNER":
-        return db.query(Company).all()
+        query = select(Company)
     else:
         # Return only companies assigned to this accountant
-        return db.query(Company).join(company_user_relation).filter(
+        query = select(Company).join(company_user_relation).filter(
             company_user_relation.c.user_id == current_user.id
-        ).all()
+        )
+    
+    cached = not_modified(request, response, await list_etag(db, query, Company.id, Company.updated_at))
+    if cached:
+        return cached
+    result = await db.execute(query)
+    return orm_json_response(List[CompanyResponse], result.scalars().all(), response)
 
 @router.get("/{company_id}", response_model=CompanyResponse)
-def get_company(
+async def get_company(
     company_id: uuid.UUID, 
-    db: Session = Depends(get_db), 
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db), 
     current_user: User = Depends(get_current_user)
 ):
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Company not found"
         )
+    
+    cached = not_modified(request, response, make_etag(company.id, company.updated_at))
+    if cached:
+        return cached
     return company
 
 @router.put("/{company_id}", response_model=CompanyResponse)
-def update_company(
+async def update_company(
     company_id: uuid.UUID,
     company_update: CompanyUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,59 +84,54 @@ def update_company(
     for field, value in company_update.dict(exclude_unset=True).items():
         setattr(company, field, value)
     
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     return company
 
 @router.delete("/{company_id}")
-def delete_company(
+async def delete_company(
     company_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Company not found"
         )
     
-    db.delete(company)
-    db.commit()
+    await db.delete(company)
+    await db.commit()
     return {"message": "Company deleted successfully"}
 
 @router.post("/assign-accountant")
-def assign_accountant_to_companies(
+async def assign_accountant_to_companies(
     request: AssignAccountantRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
     # Verify accountant exists
-    accountant = db.query(User).filter(
+    result = await db.execute(select(User).filter(
         User.id == request.user_id, 
         User.role == "ACCOUNTANT"
-    ).first()
+    ))
+    accountant = result.scalars().first()
     if not accountant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Accountant not found"
         )
     
-    # Remove existing assignments
-    db.execute(
-        company_user_relation.delete().where(
-            company_user_relation.c.user_id == request.user_id
-        )
-    )
-    
-    # Add new assignments
-    for company_id in request.company_ids:
-        db.execute(
-            company_user_relation.insert().values(
-                company_id=company_id,
-                user_id=request.user_id
-            )
+    missing = await missing_ids(db, Company.id, request.company_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Companies not found: {', '.join(map(str, missing))}"
         )
     
-    db.commit()
-    return {"message": "Accountant assigned to companies successfully"}
+    changes = await sync_links(
+        db, company_user_relation, "user_id", request.user_id, "company_id", request.company_ids
+    )
+    await db.commit()
+    return {"message": "Accountant assigned to companies successfully", **changes}
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.user import User
+from app.utils.dashboard import dashboard_counters, recent_transactions
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+RECENT_TRANSACTIONS = 4
+
+@router.get("/snapshot")
+async def get_dashboard_snapshot(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    snapshot = await dashboard_counters(db)
+    snapshot["recent_transactions"] = await recent_transactions(db, RECENT_TRANSACTIONS)
+    return snapshot
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.models.document import Document
+from app.models.job import DocumentJob
 from app.models.user import User
 from app.schemas.document import DocumentCreate, DocumentResponse, DocumentUpdate
+from app.schemas.job import DocumentJobResponse, JobStage
 from app.utils.dependencies import get_current_user
+from app.utils.etag import make_etag, not_modified
+from app.utils.file_response import file_response
+from app.utils.jobs import enqueue_job, has_pending_job
+from app.utils.responses import orm_json_response
+from app.utils.pagination import MAX_LIMIT, paginate
+from app.utils.storage import (
+    hash_upload, acquire_blob, release_blob, discard_blob, restore_blob, remove_file, is_within, blob_path
+)
 import uuid
 import os
-import shutil
 from pathlib import Path
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -16,23 +27,20 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = "uploads"
 Path(UPLOAD_DIR).mkdir(exist_ok=True)
+# Uploaded content is stored once per SHA-256 under here
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
 
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(
     file: UploadFile = File(...),
     party_name: Optional[str] = None,
     doc_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Identical content is already on disk when its blob exists
+    digest = await hash_upload(file, settings.max_upload_size)
+    file_path, created = await acquire_blob(db, file, BLOB_DIR, digest)
     
     # Create document record
     document = Document(
@@ -40,108 +48,188 @@ async def upload_document(
         file_url=file_path,
         party_name=party_name,
         type=doc_type,
-        status="uploaded"
+        status="uploaded",
+        content_hash=digest.sha256,
+        file_size=digest.size
     )
     
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    try:
+        await db.flush()
+        enqueue_job(db, document.id, JobStage.EXTRACT_TEXT)
+        await db.commit()
+    except Exception:
+        if created:
+            await remove_file(file_path)
+        raise
+    await db.refresh(document)
     return document
 
 @router.post("/", response_model=DocumentResponse)
-def create_document(
+async def create_document(
     document: DocumentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     db_document = Document(**document.dict())
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    await db.commit()
+    await db.refresh(db_document)
     return db_document
 
 @router.get("/", response_model=List[DocumentResponse])
-def get_documents(
-    skip: int = 0,
-    limit: int = 100,
+async def get_documents(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     doc_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Document)
+    query = select(Document)
     
     if status:
         query = query.filter(Document.status == status)
     if doc_type:
         query = query.filter(Document.type == doc_type)
     
-    return query.offset(skip).limit(limit).all()
+    rows = await paginate(
+        db, query, Document.upload_date, Document.id, response, skip, limit, cursor,
+        request=request, version_column=Document.updated_at
+    )
+    return orm_json_response(List[DocumentResponse], rows, response)
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-def get_document(
+async def get_document(
     document_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
+    
+    cached = not_modified(request, response, make_etag(document.id, document.updated_at))
+    if cached:
+        return cached
     return document
 
+@router.api_route("/{document_id}/content", methods=["GET", "HEAD"])
+async def get_document_content(
+    document_id: uuid.UUID,
+    request: Request,
+    v: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The stored file, with Range support for PDF viewers.
+
+    Pass v=<content_hash> for a URL that can be cached as immutable;
+    without it, or once the document's content has changed, clients
+    revalidate against the ETag.
+    """
+    document = await db.get(Document, document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    # Don't hold a pooled connection while the file is sent
+    await db.close()
+    
+    # file_url is client-writable on documents created through the API, so
+    # only files in the upload directory are ever served
+    path = os.path.realpath(document.file_url)
+    if not is_within(UPLOAD_DIR, path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document file not found"
+        )
+    # The hash names the bytes only when the file is its blob; anything
+    # else is validated from the file itself
+    content_hash = document.content_hash
+    is_blob = content_hash is not None and path == os.path.realpath(blob_path(BLOB_DIR, content_hash))
+    return await file_response(
+        request,
+        path,
+        document.file_name,
+        etag=f'"{content_hash}"' if is_blob else None,
+        immutable=is_blob and v == content_hash,
+    )
+
 @router.put("/{document_id}", response_model=DocumentResponse)
-def update_document(
+async def update_document(
     document_id: uuid.UUID,
     document_update: DocumentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    for field, value in document_update.dict(exclude_unset=True).items():
+    changes = document_update.dict(exclude_unset=True)
+    # Uploaded content is a reference-counted blob; repointing it would
+    # leak the old blob and release the wrong one on delete
+    if document.content_hash and changes.get("file_url", document.file_url) != document.file_url:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file_url cannot be changed for uploaded documents"
+        )
+    for field, value in changes.items():
         setattr(document, field, value)
     
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
     return document
 
 @router.delete("/{document_id}")
-def delete_document(
+async def delete_document(
     document_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    # Delete physical file if it exists
-    if os.path.exists(document.file_url):
-        os.remove(document.file_url)
-    
-    db.delete(document)
-    db.commit()
+    # Shared content only goes with its last document, and files are only
+    # deleted once the row is gone for good
+    file_url = document.file_url
+    released = await release_blob(db, document.content_hash)
+    await db.delete(document)
+    try:
+        await db.commit()
+    except Exception:
+        await restore_blob(released)
+        raise
+    await discard_blob(released)
+    if released is None and is_within(UPLOAD_DIR, file_url) and not is_within(BLOB_DIR, file_url):
+        await remove_file(file_url)
     return {"message": "Document deleted successfully"}
 
 @router.patch("/{document_id}/status")
-def update_document_status(
+async def update_document_status(
     document_id: uuid.UUID,
     new_status: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,5 +237,40 @@ def update_document_status(
         )
     
     document.status = new_status
-    db.commit()
+    await db.commit()
     return {"message": f"Document status updated to {new_status}"}
+
+@router.post("/{document_id}/process", response_model=DocumentJobResponse)
+async def process_document(
+    document_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    document = await db.get(Document, document_id)
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if await has_pending_job(db, document_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document is already queued for processing"
+        )
+    
+    job = enqueue_job(db, document_id, JobStage.EXTRACT_TEXT)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+@router.get("/{document_id}/jobs", response_model=List[DocumentJobResponse])
+async def get_document_jobs(
+    document_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(DocumentJob).filter(DocumentJob.document_id == document_id).order_by(DocumentJob.id)
+    )
+    return orm_json_response(List[DocumentJobResponse], result.scalars().all())
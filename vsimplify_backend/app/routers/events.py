@@ -0,0 +1,54 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
+from app.models.user import User
+from app.utils.dependencies import get_stream_user
+from app.utils.events import broadcaster
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Tells EventSource how long to wait before reconnecting, in milliseconds
+RETRY_FRAME = b"retry: 5000\n\n"
+HEARTBEAT_FRAME = b": keepalive\n\n"
+
+async def _event_stream():
+    queue = broadcaster.subscribe()
+    try:
+        yield RETRY_FRAME
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), settings.event_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield HEARTBEAT_FRAME
+    finally:
+        broadcaster.unsubscribe(queue)
+
+@router.get("/stream")
+async def stream_events(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_stream_user)
+):
+    """Server-sent dashboard changes.
+
+    "counters" carries only the /dashboard/snapshot figures that changed,
+    with their new values; "transactions" the invoices and payments just
+    inserted; "resync" asks the client to refetch the snapshot. The token
+    may be passed as ?token= since EventSource cannot set headers.
+    """
+    if broadcaster.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event stream clients"
+        )
+    # The stream stays open for as long as the page does; don't hold a
+    # pooled connection for it
+    await db.close()
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
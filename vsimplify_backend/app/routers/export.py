@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date, timedelta
+from app.config import settings
+from app.database import get_async_db
+from app.models.document import Document
+from app.models.invoice import Invoice
+from app.models.payment import PostingPaymentDetails
+from app.models.user import User
+from app.schemas.document import DocumentResponse
+from app.schemas.export import ExportFormat
+from app.schemas.invoice import InvoiceResponse
+from app.schemas.payment import PaymentResponse
+from app.utils.dependencies import get_current_user
+from app.utils.export import export_response
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Each export streams from its own session (see export_response), so the
+# request's session, used only to authenticate, is closed before the body
+# starts rather than held idle until the stream ends
+
+def _within_days(column, start_date: Optional[date], end_date: Optional[date]):
+    # Timestamps are compared against whole days so end_date is inclusive
+    conditions = []
+    if start_date:
+        conditions.append(column >= start_date)
+    if end_date:
+        conditions.append(column < end_date + timedelta(days=1))
+    return conditions
+
+@router.get("/invoices")
+async def export_invoices(
+    format: ExportFormat = ExportFormat.CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    accounting_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = select(Invoice).filter(*_within_days(Invoice.created_date, start_date, end_date))
+
+    if category:
+        query = query.filter(Invoice.category == category)
+    if accounting_type:
+        query = query.filter(Invoice.accounting_type == accounting_type)
+
+    query = query.order_by(Invoice.created_date, Invoice.id)
+    await db.close()
+    return export_response(query, InvoiceResponse, format, "invoices", settings.export_batch_size)
+
+@router.get("/payments")
+async def export_payments(
+    format: ExportFormat = ExportFormat.CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    payment_mode: Optional[str] = None,
+    payment_source: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = select(PostingPaymentDetails)
+
+    if start_date:
+        query = query.filter(PostingPaymentDetails.posting_date >= start_date)
+    if end_date:
+        query = query.filter(PostingPaymentDetails.posting_date <= end_date)
+    if payment_mode:
+        query = query.filter(PostingPaymentDetails.payment_mode == payment_mode)
+    if payment_source:
+        query = query.filter(PostingPaymentDetails.payment_source == payment_source)
+
+    query = query.order_by(PostingPaymentDetails.posting_date, PostingPaymentDetails.id)
+    await db.close()
+    return export_response(query, PaymentResponse, format, "payments", settings.export_batch_size)
+
+@router.get("/documents")
+async def export_documents(
+    format: ExportFormat = ExportFormat.CSV,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    doc_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = select(Document).filter(*_within_days(Document.upload_date, start_date, end_date))
+
+    if status:
+        query = query.filter(Document.status == status)
+    if doc_type:
+        query = query.filter(Document.type == doc_type)
+
+    query = query.order_by(Document.upload_date, Document.id)
+    await db.close()
+    return export_response(query, DocumentResponse, format, "documents", settings.export_batch_size)
@@ -0,0 +1,37 @@
+import time
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, async_engine, engine
+from app.utils.pool_stats import pool_status
+from app.utils.dependencies import token_cache, user_cache
+from app.utils.jobs import job_stats
+from app.utils.password_hasher import password_hasher
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/db")
+async def database_health(db: AsyncSession = Depends(get_async_db)):
+    start = time.perf_counter()
+    max_connections = (await db.execute(text("SHOW max_connections"))).scalar()
+    latency_ms = (time.perf_counter() - start) * 1000
+    
+    return {
+        "status": "healthy",
+        "latency_ms": round(latency_ms, 3),
+        "max_connections": int(max_connections),
+        "async_pool": pool_status(async_engine.pool),
+        "sync_pool": pool_status(engine.pool),
+    }
+
+@router.get("/auth")
+async def auth_health():
+    return {
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+    }
+
+@router.get("/jobs")
+async def jobs_health(window_minutes: int = Query(15, ge=1, le=1440), db: AsyncSession = Depends(get_async_db)):
+    return await job_stats(db, window_minutes)
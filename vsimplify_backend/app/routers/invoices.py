@@ -1,25 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
-from app.models.invoice import Invoice
+from datetime import date
+from decimal import Decimal
+from app.config import settings
+from app.database import get_async_db
+from app.models.invoice import Invoice, InvoiceDetailEntry, InvoiceFact
 from app.models.document import Document
 from app.models.user import User
-from app.schemas.invoice import InvoiceCreate, InvoiceResponse, InvoiceUpdate
+from app.schemas.invoice import InvoiceCreate, InvoiceResponse, InvoiceUpdate, BulkRowError, BulkInvoiceResult, SpendGroupBy
 from app.utils.dependencies import get_current_user
+from app.utils.etag import make_etag, not_modified
+from app.utils.responses import orm_json_response
+from app.utils.pagination import MAX_LIMIT, paginate
+from app.utils.prefix import starts_with
+from app.utils.ndjson import iter_lines
 import uuid
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 @router.post("/", response_model=InvoiceResponse)
-def create_invoice(
+async def create_invoice(
     invoice: InvoiceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify document exists if doc_id is provided
     if invoice.doc_id:
-        document = db.query(Document).filter(Document.id == invoice.doc_id).first()
+        document = await db.get(Document, invoice.doc_id)
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -39,99 +50,288 @@ def create_invoice(
     )
     
     db.add(db_invoice)
-    db.commit()
-    db.refresh(db_invoice)
+    await db.commit()
+    await db.refresh(db_invoice)
     return db_invoice
 
+async def _insert_invoice_batch(db: AsyncSession, batch: list, errors: list) -> int:
+    # One set-based existence check for every doc_id in the batch
+    doc_ids = {invoice.doc_id for _, invoice in batch if invoice.doc_id}
+    existing = set()
+    if doc_ids:
+        result = await db.execute(select(Document.id).filter(Document.id.in_(doc_ids)))
+        existing = set(result.scalars())
+    
+    rows = []
+    for line_no, invoice in batch:
+        if invoice.doc_id and invoice.doc_id not in existing:
+            errors.append(BulkRowError(line=line_no, error="Document not found"))
+            continue
+        rows.append((line_no, {
+            "id": uuid.uuid4(),
+            "doc_id": invoice.doc_id,
+            "category": invoice.category,
+            "accounting_type": invoice.accounting_type,
+            "invoice_details": [detail.dict() for detail in invoice.invoice_details] if invoice.invoice_details else None,
+        }))
+    if not rows:
+        return 0
+    
+    try:
+        await db.execute(insert(Invoice).values([row for _, row in rows]))
+        await db.commit()
+        return len(rows)
+    except DBAPIError:
+        await db.rollback()
+    
+    # Something in the batch was refused; insert row by row so only the
+    # offending lines are reported and the rest are still stored
+    inserted = 0
+    for line_no, row in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Invoice).values(row))
+            inserted += 1
+        except DBAPIError as e:
+            # The driver's own exception carries the bare message
+            reason = e.orig.__cause__ or e.orig
+            errors.append(BulkRowError(line=line_no, error=f"Rejected by the database: {reason}"))
+    await db.commit()
+    return inserted
+
+@router.post("/bulk", response_model=BulkInvoiceResult)
+async def create_invoices_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ingest invoices from an NDJSON body, one InvoiceCreate object per line.
+
+    Lines are validated and inserted in batches as the body streams in;
+    each batch commits on its own and bad lines are reported by line
+    number instead of failing the request.
+    """
+    inserted = 0
+    errors = []
+    batch = []
+    async for line_no, line in iter_lines(request.stream(), settings.bulk_max_line_size):
+        if line is None:
+            errors.append(BulkRowError(line=line_no, error=f"Line exceeds {settings.bulk_max_line_size} bytes"))
+            continue
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_no, InvoiceCreate.model_validate_json(line)))
+        except ValidationError as e:
+            errors.append(BulkRowError(line=line_no, error=str(e)))
+        if len(batch) >= settings.bulk_insert_batch_size:
+            inserted += await _insert_invoice_batch(db, batch, errors)
+            batch = []
+    if batch:
+        inserted += await _insert_invoice_batch(db, batch, errors)
+    
+    errors.sort(key=lambda error: error.line)
+    return {"inserted": inserted, "errors": errors}
+
 @router.get("/", response_model=List[InvoiceResponse])
-def get_invoices(
-    skip: int = 0,
-    limit: int = 100,
+async def get_invoices(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     accounting_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Invoice)
+    query = select(Invoice)
     
     if category:
         query = query.filter(Invoice.category == category)
     if accounting_type:
         query = query.filter(Invoice.accounting_type == accounting_type)
     
-    return query.offset(skip).limit(limit).all()
+    rows = await paginate(
+        db, query, Invoice.created_date, Invoice.id, response, skip, limit, cursor,
+        request=request, version_column=Invoice.updated_at
+    )
+    return orm_json_response(List[InvoiceResponse], rows, response)
+
+@router.get("/search", response_model=List[InvoiceResponse])
+async def search_invoices(
+    response: Response,
+    request: Request,
+    label: str,
+    value: Optional[str] = None,
+    value_prefix: Optional[str] = None,
+    min_value: Optional[Decimal] = None,
+    max_value: Optional[Decimal] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Find invoices by one invoice_details entry, e.g. label=GSTIN&value=...
+
+    Labels match case-insensitively. value is an exact match, value_prefix
+    a starts-with match and min_value/max_value a numeric range over values
+    that read as numbers.
+    """
+    if value is None and value_prefix is None and min_value is None and max_value is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide value, value_prefix, min_value or max_value"
+        )
+
+    matches = select(InvoiceDetailEntry.invoice_id).filter(InvoiceDetailEntry.label == label.strip().lower())
+    if value is not None:
+        matches = matches.filter(InvoiceDetailEntry.value == value)
+    if value_prefix:
+        # value is C-collated, so the LIKE prefix seeks the index
+        matches = matches.filter(starts_with(InvoiceDetailEntry.value, value_prefix))
+    if min_value is not None:
+        matches = matches.filter(InvoiceDetailEntry.numeric_value >= min_value)
+    if max_value is not None:
+        matches = matches.filter(InvoiceDetailEntry.numeric_value <= max_value)
+
+    query = select(Invoice).filter(Invoice.id.in_(matches))
+    rows = await paginate(
+        db, query, Invoice.created_date, Invoice.id, response, skip, limit, cursor,
+        request=request, version_column=Invoice.updated_at
+    )
+    return orm_json_response(List[InvoiceResponse], rows, response)
+
+def _spend_totals(row) -> dict:
+    return {
+        "invoice_count": int(row.invoice_count or 0),
+        "taxable_amount": float(row.taxable_amount) if row.taxable_amount else 0.0,
+        "tax_amount": float(row.tax_amount) if row.tax_amount else 0.0,
+        "total_amount": float(row.total_amount) if row.total_amount else 0.0
+    }
+
+@router.get("/summary/spend")
+async def get_invoice_spend(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    accounting_type: Optional[str] = None,
+    group_by: Optional[SpendGroupBy] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Aggregated in SQL over the typed invoice_fact projection
+    totals = [
+        func.count().label('invoice_count'),
+        func.sum(InvoiceFact.taxable_amount).label('taxable_amount'),
+        func.sum(InvoiceFact.tax_amount).label('tax_amount'),
+        func.sum(InvoiceFact.total_amount).label('total_amount')
+    ]
+    query = select(*totals).select_from(InvoiceFact)
+    
+    if start_date:
+        query = query.filter(InvoiceFact.accounting_date >= start_date)
+    if end_date:
+        query = query.filter(InvoiceFact.accounting_date <= end_date)
+    if category:
+        query = query.filter(InvoiceFact.category == category)
+    if accounting_type:
+        query = query.filter(InvoiceFact.accounting_type == accounting_type)
+    
+    summary = _spend_totals((await db.execute(query)).first())
+    if group_by is None:
+        return summary
+    
+    group_column = {
+        SpendGroupBy.CATEGORY: InvoiceFact.category,
+        SpendGroupBy.ACCOUNTING_TYPE: InvoiceFact.accounting_type,
+        SpendGroupBy.MONTH: func.to_char(InvoiceFact.accounting_date, 'YYYY-MM'),
+        SpendGroupBy.SUPPLIER: func.coalesce(InvoiceFact.supplier_name, InvoiceFact.gstin),
+    }[group_by].label('key')
+    grouped = query.add_columns(group_column).group_by(group_column).order_by(group_column)
+    summary["groups"] = [
+        {"key": row.key, **_spend_totals(row)} for row in await db.execute(grouped)
+    ]
+    return summary
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
-def get_invoice(
+async def get_invoice(
     invoice_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    invoice = await db.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invoice not found"
         )
+    
+    cached = not_modified(request, response, make_etag(invoice.id, invoice.updated_at))
+    if cached:
+        return cached
     return invoice
 
 @router.put("/{invoice_id}", response_model=InvoiceResponse)
-def update_invoice(
+async def update_invoice(
     invoice_id: uuid.UUID,
     invoice_update: InvoiceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    invoice = await db.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invoice not found"
         )
     
-    # Handle invoice_details conversion
+    # .dict() already turns nested invoice_details into plain dicts
     update_data = invoice_update.dict(exclude_unset=True)
-    if 'invoice_details' in update_data and update_data['invoice_details']:
-        update_data['invoice_details'] = [detail.dict() for detail in update_data['invoice_details']]
     
     for field, value in update_data.items():
         setattr(invoice, field, value)
     
-    db.commit()
-    db.refresh(invoice)
+    await db.commit()
+    await db.refresh(invoice)
     return invoice
 
 @router.delete("/{invoice_id}")
-def delete_invoice(
+async def delete_invoice(
     invoice_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+    invoice = await db.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invoice not found"
         )
     
-    db.delete(invoice)
-    db.commit()
+    await db.delete(invoice)
+    await db.commit()
     return {"message": "Invoice deleted successfully"}
 
 @router.get("/document/{document_id}", response_model=List[InvoiceResponse])
-def get_invoices_by_document(
+async def get_invoices_by_document(
     document_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    invoices = db.query(Invoice).filter(Invoice.doc_id == document_id).all()
-    return invoices
+    result = await db.execute(select(Invoice).filter(Invoice.doc_id == document_id))
+    invoices = result.scalars().all()
+    return orm_json_response(List[InvoiceResponse], invoices)
 
 @router.get("/category/{category}", response_model=List[InvoiceResponse])
-def get_invoices_by_category(
+async def get_invoices_by_category(
     category: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    invoices = db.query(Invoice).filter(Invoice.category == category).all()
-    return invoices
+    result = await db.execute(select(Invoice).filter(Invoice.category == category))
+    invoices = result.scalars().all()
+    return orm_json_response(List[InvoiceResponse], invoices)
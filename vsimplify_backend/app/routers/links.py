@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.company import Company, company_user_relation
+from app.models.supplier import Supplier, company_supplier_relation
+from app.models.user import User
+from app.schemas.link import LinkRelation, LinkChanges, LinkResult
+from app.utils.dependencies import require_owner
+from app.utils.links import missing_ids
+
+router = APIRouter(prefix="/links", tags=["links"])
+
+# Association table, member column, member id column, the criteria a new
+# member must meet and its label in errors, for each relation
+RELATIONS = {
+    # Only accountants are assigned to companies, as in /companies/assign-accountant
+    LinkRelation.COMPANY_USERS: (company_user_relation, "user_id", User.id, (User.role == "ACCOUNTANT",), "Accountants"),
+    LinkRelation.COMPANY_SUPPLIERS: (company_supplier_relation, "supplier_id", Supplier.id, (), "Suppliers"),
+}
+
+@router.post("/{relation}", response_model=LinkResult)
+async def apply_link_changes(
+    relation: LinkRelation,
+    changes: LinkChanges,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_owner)
+):
+    """Add and remove many company links in one request.
+
+    Owners only, with the role read fresh from the database. Every id is
+    validated with one IN query per table, then all additions go in as
+    one INSERT and all removals as one DELETE. Links that already exist
+    are skipped, and the counts report only rows actually changed.
+    """
+    table, member_column, member_id_column, member_criteria, member_label = RELATIONS[relation]
+
+    for id_column, ids, criteria, label in (
+        (Company.id, {pair.company_id for pair in changes.add}, (), "Companies"),
+        (member_id_column, {pair.member_id for pair in changes.add}, member_criteria, member_label),
+    ):
+        missing = await missing_ids(db, id_column, ids, *criteria)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{label} not found: {', '.join(map(str, missing))}"
+            )
+
+    removed = 0
+    if changes.remove:
+        pairs = {(pair.company_id, pair.member_id) for pair in changes.remove}
+        result = await db.execute(
+            table.delete().where(tuple_(table.c.company_id, table.c[member_column]).in_(pairs))
+        )
+        removed = result.rowcount
+
+    added = 0
+    if changes.add:
+        pairs = {(pair.company_id, pair.member_id) for pair in changes.add}
+        result = await db.execute(
+            insert(table)
+            .values([{"company_id": company_id, member_column: member_id} for company_id, member_id in pairs])
+            .on_conflict_do_nothing()
+        )
+        added = result.rowcount
+
+    await db.commit()
+    return {"added": added, "removed": removed}
@@ -1,40 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
-from app.database import get_db
-from app.models.payment import PostingPaymentDetails
+from app.database import get_async_db
+from app.models.payment import PostingPaymentDetails, PaymentDailyRollup
 from app.models.user import User
-from app.schemas.payment import PaymentCreate, PaymentResponse, PaymentUpdate
+from app.schemas.payment import PaymentCreate, PaymentResponse, PaymentUpdate, StatementImportResult, SummaryGroupBy
 from app.utils.dependencies import get_current_user
+from app.utils.etag import make_etag, not_modified
+from app.utils.responses import orm_json_response
+from app.utils.pagination import MAX_LIMIT, paginate
+from app.utils.bank_import import import_statement, open_statement
 import uuid
+import csv
+import json
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 @router.post("/", response_model=PaymentResponse)
-def create_payment(
+async def create_payment(
     payment: PaymentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     db_payment = PostingPaymentDetails(**payment.dict())
     db.add(db_payment)
-    db.commit()
-    db.refresh(db_payment)
+    await db.commit()
+    await db.refresh(db_payment)
     return db_payment
 
+@router.post("/import", response_model=StatementImportResult)
+async def import_bank_statement(
+    file: UploadFile = File(...),
+    payment_source: Optional[str] = Form(None),
+    column_map: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Import a CSV bank statement, skipping ref_nos that are already recorded.
+
+    column_map is an optional JSON object of statement header to payment
+    field, for headers the built-in bank mappings do not recognise.
+    """
+    try:
+        mapping = json.loads(column_map) if column_map else None
+        summary = await import_statement(db, open_statement(file.file), mapping, payment_source)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not import statement: {e}"
+        )
+    await db.commit()
+    return summary
+
 @router.get("/", response_model=List[PaymentResponse])
-def get_payments(
-    skip: int = 0,
-    limit: int = 100,
+async def get_payments(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
     payment_mode: Optional[str] = None,
     payment_source: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(PostingPaymentDetails)
+    query = select(PostingPaymentDetails)
     
     if payment_mode:
         query = query.filter(PostingPaymentDetails.payment_mode == payment_mode)
@@ -45,30 +79,40 @@ def get_payments(
     if end_date:
         query = query.filter(PostingPaymentDetails.posting_date <= end_date)
     
-    return query.offset(skip).limit(limit).all()
+    rows = await paginate(
+        db, query, PostingPaymentDetails.created_date, PostingPaymentDetails.id, response, skip, limit, cursor,
+        request=request, version_column=PostingPaymentDetails.updated_at
+    )
+    return orm_json_response(List[PaymentResponse], rows, response)
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
-def get_payment(
+async def get_payment(
     payment_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    payment = db.query(PostingPaymentDetails).filter(PostingPaymentDetails.id == payment_id).first()
+    payment = await db.get(PostingPaymentDetails, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment not found"
         )
+    
+    cached = not_modified(request, response, make_etag(payment.id, payment.updated_at))
+    if cached:
+        return cached
     return payment
 
 @router.put("/{payment_id}", response_model=PaymentResponse)
-def update_payment(
+async def update_payment(
     payment_id: uuid.UUID,
     payment_update: PaymentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    payment = db.query(PostingPaymentDetails).filter(PostingPaymentDetails.id == payment_id).first()
+    payment = await db.get(PostingPaymentDetails, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,34 +122,35 @@ def update_payment(
     for field, value in payment_update.dict(exclude_unset=True).items():
         setattr(payment, field, value)
     
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
+    await db.refresh(payment)
     return payment
 
 @router.delete("/{payment_id}")
-def delete_payment(
+async def delete_payment(
     payment_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    payment = db.query(PostingPaymentDetails).filter(PostingPaymentDetails.id == payment_id).first()
+    payment = await db.get(PostingPaymentDetails, payment_id)
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Payment not found"
         )
     
-    db.delete(payment)
-    db.commit()
+    await db.delete(payment)
+    await db.commit()
     return {"message": "Payment deleted successfully"}
 
 @router.get("/ref/{ref_no}", response_model=PaymentResponse)
-def get_payment_by_ref(
+async def get_payment_by_ref(
     ref_no: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    payment = db.query(PostingPaymentDetails).filter(PostingPaymentDetails.ref_no == ref_no).first()
+    result = await db.execute(select(PostingPaymentDetails).filter(PostingPaymentDetails.ref_no == ref_no))
+    payment = result.scalars().first()
     if not payment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,45 +159,64 @@ def get_payment_by_ref(
     return payment
 
 @router.get("/date-range/{start_date}/{end_date}", response_model=List[PaymentResponse])
-def get_payments_by_date_range(
+async def get_payments_by_date_range(
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    payments = db.query(PostingPaymentDetails).filter(
+    result = await db.execute(select(PostingPaymentDetails).filter(
         PostingPaymentDetails.posting_date >= start_date,
         PostingPaymentDetails.posting_date <= end_date
-    ).all()
-    return payments
+    ))
+    payments = result.scalars().all()
+    return orm_json_response(List[PaymentResponse], payments)
+
+def _summary_totals(row) -> dict:
+    return {
+        "total_payments": int(row.total_payments or 0),
+        "total_amount_paid": float(row.total_amount_paid) if row.total_amount_paid else 0.0,
+        "total_amount": float(row.total_amount) if row.total_amount else 0.0
+    }
 
 @router.get("/summary/total")
-def get_payment_summary(
+async def get_payment_summary(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     payment_mode: Optional[str] = None,
-    db: Session = Depends(get_db),
+    payment_source: Optional[str] = None,
+    group_by: Optional[SummaryGroupBy] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    from sqlalchemy import func
-    
-    query = db.query(
-        func.count(PostingPaymentDetails.id).label('total_payments'),
-        func.sum(PostingPaymentDetails.amount_paid).label('total_amount_paid'),
-        func.sum(PostingPaymentDetails.total_amount).label('total_amount')
-    )
+    # Answered from the trigger-maintained daily rollups, never the payment rows
+    totals = [
+        func.sum(PaymentDailyRollup.payment_count).label('total_payments'),
+        func.sum(PaymentDailyRollup.amount_paid).label('total_amount_paid'),
+        func.sum(PaymentDailyRollup.total_amount).label('total_amount')
+    ]
+    query = select(*totals).filter(PaymentDailyRollup.payment_count > 0)
     
     if start_date:
-        query = query.filter(PostingPaymentDetails.posting_date >= start_date)
+        query = query.filter(PaymentDailyRollup.posting_date >= start_date)
     if end_date:
-        query = query.filter(PostingPaymentDetails.posting_date <= end_date)
+        query = query.filter(PaymentDailyRollup.posting_date <= end_date)
     if payment_mode:
-        query = query.filter(PostingPaymentDetails.payment_mode == payment_mode)
+        query = query.filter(PaymentDailyRollup.payment_mode == payment_mode)
+    if payment_source:
+        query = query.filter(PaymentDailyRollup.payment_source == payment_source)
     
-    result = query.first()
+    summary = _summary_totals((await db.execute(query)).first())
+    if group_by is None:
+        return summary
     
-    return {
-        "total_payments": result.total_payments or 0,
-        "total_amount_paid": float(result.total_amount_paid) if result.total_amount_paid else 0.0,
-        "total_amount": float(result.total_amount) if result.total_amount else 0.0
-    }
+    group_column = {
+        SummaryGroupBy.MONTH: func.to_char(PaymentDailyRollup.posting_date, 'YYYY-MM'),
+        SummaryGroupBy.MODE: PaymentDailyRollup.payment_mode,
+        SummaryGroupBy.SOURCE: PaymentDailyRollup.payment_source,
+    }[group_by].label('key')
+    grouped = query.add_columns(group_column).group_by(group_column).order_by(group_column)
+    summary["groups"] = [
+        {"key": row.key, **_summary_totals(row)} for row in await db.execute(grouped)
+    ]
+    return summary
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Float, cast, func, literal, null, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app.models.company import Company
+from app.models.document import Document
+from app.models.supplier import Supplier
+from app.models.user import User
+from app.schemas.search import TypeaheadKind, TypeaheadResult
+from app.utils.dependencies import get_current_user
+from app.utils.prefix import starts_with
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# (id column, name column) searched for each kind; party names have no id
+SOURCES = {
+    TypeaheadKind.SUPPLIER: (Supplier.id, Supplier.name),
+    TypeaheadKind.LEDGER: (Supplier.id, Supplier.ledger_name),
+    TypeaheadKind.COMPANY: (Company.id, Company.name),
+    TypeaheadKind.PARTY: (None, Document.party_name),
+}
+
+# Shorter queries have too few trigrams to rank, so they only prefix-match
+FUZZY_MIN_LENGTH = 3
+
+_trigram_available: Optional[bool] = None
+
+async def _has_trigram(db: AsyncSession) -> bool:
+    global _trigram_available
+    if _trigram_available is None:
+        result = await db.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"))
+        _trigram_available = bool(result.scalar())
+    return _trigram_available
+
+def _branch(kind: TypeaheadKind, q: str, limit: int, fuzzy: bool, trigram: bool):
+    id_column, column = SOURCES[kind]
+    if fuzzy:
+        # Word similarity matches q against any run of words in the name;
+        # <% and <<-> are both served by the GiST trigram index
+        key = func.lower(column)
+        condition, order = literal(q).op("<%")(key), literal(q).op("<<->")(key)
+    else:
+        # The LIKE prefix seeks the C-collated prefix index
+        key = func.lower(column).collate("C")
+        condition, order = starts_with(key, q), key
+
+    if trigram:
+        score = func.word_similarity(q, key)
+    else:
+        score = cast(len(q), Float) / func.greatest(func.length(key), 1)
+
+    columns = [
+        literal(kind.value).label("kind"),
+        (null() if id_column is None else id_column).label("id"),
+        (func.min(column) if id_column is None else column).label("name"),
+        starts_with(key, q).label("prefix"),
+        score.label("score"),
+    ]
+    query = select(*columns).filter(condition)
+    if id_column is None:
+        # Party names repeat across documents; each is returned once
+        query = query.group_by(key)
+    return query.order_by(order).limit(limit)
+
+@router.get("/typeahead", response_model=List[TypeaheadResult])
+async def typeahead(
+    q: str = Query(..., min_length=1, max_length=100),
+    kinds: List[TypeaheadKind] = Query(list(TypeaheadKind)),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ranked name suggestions across suppliers, ledgers, companies and parties.
+
+    Prefix matches rank first, then fuzzy (trigram) matches, each by
+    similarity to q. Every kind contributes at most limit prefix and limit
+    fuzzy candidates, all fetched in one UNION ALL round trip. Without
+    pg_trgm in the database only prefix matches are returned.
+    """
+    q = q.strip().lower()
+    if not q:
+        return []
+
+    trigram = await _has_trigram(db)
+    branches = []
+    for kind in dict.fromkeys(kinds):
+        branches.append(_branch(kind, q, limit, False, trigram))
+        if trigram and len(q) >= FUZZY_MIN_LENGTH:
+            branches.append(_branch(kind, q, limit, True, trigram))
+    result = await db.execute(union_all(*branches))
+
+    results = {}
+    for row in result:
+        match_key = (row.kind, row.id or row.name.lower())
+        if match_key not in results:
+            results[match_key] = row
+    ranked = sorted(
+        results.values(),
+        key=lambda row: (not row.prefix, -row.score, len(row.name), row.name.lower())
+    )
+    return [
+        {"kind": row.kind, "id": row.id, "name": row.name, "score": round(row.score, 4)}
+        for row in ranked[:limit]
+    ]
@@ -1,68 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_async_db
 from app.models.supplier import Supplier, company_supplier_relation
 from app.models.company import Company
 from app.models.user import User
 from app.schemas.supplier import SupplierCreate, SupplierResponse, SupplierUpdate, AssignSupplierRequest
 from app.utils.dependencies import get_current_user, require_owner
+from app.utils.etag import make_etag, not_modified
+from app.utils.links import missing_ids, sync_links
+from app.utils.responses import orm_json_response
+from app.utils.pagination import MAX_LIMIT, paginate
 import uuid
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
 @router.post("/", response_model=SupplierResponse)
-def create_supplier(
+async def create_supplier(
     supplier: SupplierCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     db_supplier = Supplier(**supplier.dict())
     db.add(db_supplier)
-    db.commit()
-    db.refresh(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
     return db_supplier
 
 @router.get("/", response_model=List[SupplierResponse])
-def get_suppliers(
-    skip: int = 0,
-    limit: int = 100,
+async def get_suppliers(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
     currency_type: Optional[str] = None,
     gst_status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Supplier)
+    query = select(Supplier)
     
     if currency_type:
         query = query.filter(Supplier.currency_type == currency_type)
     if gst_status:
         query = query.filter(Supplier.gst_status == gst_status)
     
-    return query.offset(skip).limit(limit).all()
+    rows = await paginate(
+        db, query, Supplier.created_date, Supplier.id, response, skip, limit, cursor,
+        request=request, version_column=Supplier.updated_at
+    )
+    return orm_json_response(List[SupplierResponse], rows, response)
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
-def get_supplier(
+async def get_supplier(
     supplier_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = await db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found"
         )
+    
+    cached = not_modified(request, response, make_etag(supplier.id, supplier.updated_at))
+    if cached:
+        return cached
     return supplier
 
 @router.put("/{supplier_id}", response_model=SupplierResponse)
-def update_supplier(
+async def update_supplier(
     supplier_id: uuid.UUID,
     supplier_update: SupplierUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = await db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,98 +90,85 @@ def update_supplier(
     for field, value in supplier_update.dict(exclude_unset=True).items():
         setattr(supplier, field, value)
     
-    db.commit()
-    db.refresh(supplier)
+    await db.commit()
+    await db.refresh(supplier)
     return supplier
 
 @router.delete("/{supplier_id}")
-def delete_supplier(
+async def delete_supplier(
     supplier_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = await db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found"
         )
     
-    db.delete(supplier)
-    db.commit()
+    await db.delete(supplier)
+    await db.commit()
     return {"message": "Supplier deleted successfully"}
 
 @router.post("/assign-to-companies")
-def assign_supplier_to_companies(
+async def assign_supplier_to_companies(
     request: AssignSupplierRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
     # Verify supplier exists
-    supplier = db.query(Supplier).filter(Supplier.id == request.supplier_id).first()
+    supplier = await db.get(Supplier, request.supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found"
         )
     
-    # Verify all companies exist
-    for company_id in request.company_ids:
-        company = db.query(Company).filter(Company.id == company_id).first()
-        if not company:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Company with id {company_id} not found"
-            )
-    
-    # Remove existing assignments for this supplier
-    db.execute(
-        company_supplier_relation.delete().where(
-            company_supplier_relation.c.supplier_id == request.supplier_id
-        )
-    )
-    
-    # Add new assignments
-    for company_id in request.company_ids:
-        db.execute(
-            company_supplier_relation.insert().values(
-                company_id=company_id,
-                supplier_id=request.supplier_id
-            )
+    # Verify all companies exist with one query
+    missing = await missing_ids(db, Company.id, request.company_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Companies not found: {', '.join(map(str, missing))}"
         )
     
-    db.commit()
-    return {"message": "Supplier assigned to companies successfully"}
+    changes = await sync_links(
+        db, company_supplier_relation, "supplier_id", request.supplier_id, "company_id", request.company_ids
+    )
+    await db.commit()
+    return {"message": "Supplier assigned to companies successfully", **changes}
 
 @router.get("/company/{company_id}", response_model=List[SupplierResponse])
-def get_suppliers_by_company(
+async def get_suppliers_by_company(
     company_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify company exists and user has access
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Company not found"
         )
     
-    suppliers = db.query(Supplier).join(company_supplier_relation).filter(
+    result = await db.execute(select(Supplier).join(company_supplier_relation).filter(
         company_supplier_relation.c.company_id == company_id
-    ).all()
+    ))
+    suppliers = result.scalars().all()
     
-    return suppliers
+    return orm_json_response(List[SupplierResponse], suppliers)
 
 @router.delete("/company/{company_id}/supplier/{supplier_id}")
-def remove_supplier_from_company(
+async def remove_supplier_from_company(
     company_id: uuid.UUID,
     supplier_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
     # Remove the specific company-supplier relationship
-    result = db.execute(
+    result = await db.execute(
         company_supplier_relation.delete().where(
             (company_supplier_relation.c.company_id == company_id) &
             (company_supplier_relation.c.supplier_id == supplier_id)
@@ -176,5 +181,5 @@ def remove_supplier_from_company(
             detail="Supplier-Company relationship not found"
         )
     
-    db.commit()
+    await db.commit()
     return {"message": "Supplier removed from company successfully"}
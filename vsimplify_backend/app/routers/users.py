@@ -1,97 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserResponse, UserUpdate
-from app.utils.dependencies import get_current_user, require_owner
-from app.utils.auth import get_password_hash
+from app.utils.dependencies import get_current_user, require_owner, invalidate_user
+from app.utils.etag import make_etag, not_modified
+from app.utils.responses import orm_json_response
+from app.utils.password_hasher import password_hasher
+from app.utils.pagination import MAX_LIMIT, paginate
 import uuid
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    old_email = current_user.email
     for field, value in user_update.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_user(old_email, current_user.email)
+    await db.refresh(current_user)
     return current_user
 
 @router.get("/", response_model=List[UserResponse])
-def get_users(
-    skip: int = 0,
-    limit: int = 100,
+async def get_users(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
     role: UserRole = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    query = db.query(User)
+    query = select(User)
     if role:
         query = query.filter(User.role == role)
     
-    return query.offset(skip).limit(limit).all()
+    rows = await paginate(
+        db, query, User.created_date, User.id, response, skip, limit, cursor,
+        request=request, version_column=User.updated_at
+    )
+    return orm_json_response(List[UserResponse], rows, response)
 
 @router.get("/accountants", response_model=List[UserResponse])
-def get_accountants(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+async def get_accountants(
+    response: Response,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    return db.query(User).filter(User.role == UserRole.ACCOUNTANT).offset(skip).limit(limit).all()
+    query = select(User).filter(User.role == UserRole.ACCOUNTANT)
+    rows = await paginate(
+        db, query, User.created_date, User.id, response, skip, limit, cursor,
+        request=request, version_column=User.updated_at
+    )
+    return orm_json_response(List[UserResponse], rows, response)
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    
+    cached = not_modified(request, response, make_etag(user.id, user.updated_at))
+    if cached:
+        return cached
     return user
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: uuid.UUID,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    old_email = user.email
     for field, value in user_update.dict(exclude_unset=True).items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_user(old_email, user.email)
+    await db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,24 +133,26 @@ def delete_user(
             detail="Cannot delete your own account"
         )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(user.email)
     return {"message": "User deleted successfully"}
 
 @router.patch("/{user_id}/password")
-def reset_user_password(
+async def reset_user_password(
     user_id: uuid.UUID,
     new_password: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_owner)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    user.password = get_password_hash(new_password)
-    db.commit()
+    user.password = await password_hasher.hash(new_password)
+    await db.commit()
+    invalidate_user(user.email)
     return {"message": "Password reset successfully"}
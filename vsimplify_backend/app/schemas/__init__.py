@@ -1,15 +1,22 @@
 from .user import UserCreate, UserResponse, UserUpdate, Token, TokenData
 from .company import CompanyCreate, CompanyResponse, CompanyUpdate, AssignAccountantRequest
 from .document import DocumentCreate, DocumentResponse, DocumentUpdate
-from .invoice import InvoiceCreate, InvoiceResponse, InvoiceUpdate, InvoiceDetail
+from .invoice import InvoiceCreate, InvoiceResponse, InvoiceUpdate, InvoiceDetail, BulkRowError, BulkInvoiceResult, SpendGroupBy
 from .supplier import SupplierCreate, SupplierResponse, SupplierUpdate, AssignSupplierRequest
-from .payment import PaymentCreate, PaymentResponse, PaymentUpdate
+from .payment import PaymentCreate, PaymentResponse, PaymentUpdate, StatementImportResult, SummaryGroupBy
+from .export import ExportFormat
+from .search import TypeaheadKind, TypeaheadResult
+from .link import LinkRelation, LinkPair, LinkChanges, LinkResult
+from .job import JobStage, JobStatus, DocumentJobResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserUpdate", "Token", "TokenData", "UserRole",
     "CompanyCreate", "CompanyResponse", "CompanyUpdate", "AssignAccountantRequest",
     "DocumentCreate", "DocumentResponse", "DocumentUpdate",
-    "InvoiceCreate", "InvoiceResponse", "InvoiceUpdate", "InvoiceDetail",
+    "InvoiceCreate", "InvoiceResponse", "InvoiceUpdate", "InvoiceDetail", "BulkRowError", "BulkInvoiceResult", "SpendGroupBy",
     "SupplierCreate", "SupplierResponse", "SupplierUpdate", "AssignSupplierRequest",
-    "PaymentCreate", "PaymentResponse", "PaymentUpdate"
+    "PaymentCreate", "PaymentResponse", "PaymentUpdate", "StatementImportResult", "SummaryGroupBy",
+    "ExportFormat", "TypeaheadKind", "TypeaheadResult",
+    "LinkRelation", "LinkPair", "LinkChanges", "LinkResult",
+    "JobStage", "JobStatus", "DocumentJobResponse"
 ]
@@ -22,8 +22,11 @@ class DocumentUpdate(BaseModel):
 
 class DocumentResponse(DocumentBase):
     id: uuid.UUID
+    content_hash: Optional[str] = None
+    file_size: Optional[int] = None
     upload_date: datetime
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
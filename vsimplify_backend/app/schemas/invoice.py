@@ -1,17 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from enum import Enum
 import uuid
 
+# invoice_details is stored as jsonb, which cannot hold NUL characters
+NO_NUL = r"^[^\x00]*$"
+
 class InvoiceDetail(BaseModel):
-    label: str
-    value: str
-    status: str = 'active'
+    label: str = Field(pattern=NO_NUL)
+    value: str = Field(pattern=NO_NUL)
+    status: str = Field('active', pattern=NO_NUL)
 
 class InvoiceBase(BaseModel):
     doc_id: Optional[uuid.UUID] = None
-    category: Optional[str] = None
-    accounting_type: Optional[str] = None
+    category: Optional[str] = Field(None, max_length=100, pattern=NO_NUL)
+    accounting_type: Optional[str] = Field(None, max_length=100, pattern=NO_NUL)
     invoice_details: Optional[List[InvoiceDetail]] = None
 
 class InvoiceCreate(InvoiceBase):
@@ -19,8 +23,8 @@ class InvoiceCreate(InvoiceBase):
 
 class InvoiceUpdate(BaseModel):
     doc_id: Optional[uuid.UUID] = None
-    category: Optional[str] = None
-    accounting_type: Optional[str] = None
+    category: Optional[str] = Field(None, max_length=100, pattern=NO_NUL)
+    accounting_type: Optional[str] = Field(None, max_length=100, pattern=NO_NUL)
     invoice_details: Optional[List[InvoiceDetail]] = None
 
 class InvoiceResponse(InvoiceBase):
@@ -30,3 +34,18 @@ class InvoiceResponse(InvoiceBase):
     
     class Config:
         from_attributes = True
+
+class BulkRowError(BaseModel):
+    line: int
+    error: str
+
+class BulkInvoiceResult(BaseModel):
+    # Rows committed; lines listed in errors were not stored
+    inserted: int
+    errors: List[BulkRowError]
+
+class SpendGroupBy(str, Enum):
+    CATEGORY = "category"
+    ACCOUNTING_TYPE = "accounting_type"
+    MONTH = "month"
+    SUPPLIER = "supplier"
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+import uuid
+
+class JobStage(str, Enum):
+    EXTRACT_TEXT = "extract_text"
+    CLASSIFY = "classify"
+    DRAFT_INVOICE = "draft_invoice"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class DocumentJobResponse(BaseModel):
+    id: int
+    document_id: uuid.UUID
+    stage: JobStage
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    due_at: datetime
+    locked_by: Optional[str] = None
+    last_error: Optional[str] = None
+    enqueued_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List
+from enum import Enum
+import uuid
+
+class LinkRelation(str, Enum):
+    COMPANY_USERS = "company-users"
+    COMPANY_SUPPLIERS = "company-suppliers"
+
+class LinkPair(BaseModel):
+    company_id: uuid.UUID
+    # users.id for company-users, supplier.id for company-suppliers
+    member_id: uuid.UUID
+
+class LinkChanges(BaseModel):
+    add: List[LinkPair] = []
+    remove: List[LinkPair] = []
+
+class LinkResult(BaseModel):
+    added: int
+    removed: int
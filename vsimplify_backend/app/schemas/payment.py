@@ -1,8 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
+from enum import Enum
 import uuid
+from app.schemas.invoice import BulkRowError
 
 class PaymentBase(BaseModel):
     posting_date: Optional[date] = None
@@ -38,3 +40,17 @@ class PaymentResponse(PaymentBase):
     
     class Config:
         from_attributes = True
+
+class SummaryGroupBy(str, Enum):
+    MONTH = "month"
+    MODE = "mode"
+    SOURCE = "source"
+
+class StatementImportResult(BaseModel):
+    rows_read: int
+    rows_inserted: int
+    duplicates: int
+    rejected: int
+    errors: List[BulkRowError]
+    seconds: float
+    rows_per_second: float
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+import uuid
+
+class TypeaheadKind(str, Enum):
+    SUPPLIER = "supplier"
+    LEDGER = "ledger"
+    COMPANY = "company"
+    PARTY = "party"
+
+class TypeaheadResult(BaseModel):
+    kind: TypeaheadKind
+    # Party names come from documents and have no entity id
+    id: Optional[uuid.UUID] = None
+    name: str
+    score: float
@@ -0,0 +1,258 @@
+import argparse
+import asyncio
+import csv
+import io
+import re
+import time
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Dict, Optional
+import asyncpg
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+STAGING_TABLE = "payment_import_staging"
+# Held while staged rows are merged, so concurrent imports of the same
+# statement cannot both find a ref_no missing and insert it twice
+IMPORT_LOCK = "payment_import"
+
+PAYMENT_COLUMNS = (
+    "posting_date", "booking_remarks", "date_of_payment", "payment_mode", "payment_source",
+    "amount_paid", "total_amount", "ref_no", "narration", "doc_of_proof_url",
+)
+DATE_COLUMNS = {"posting_date", "date_of_payment"}
+AMOUNT_COLUMNS = {"amount_paid", "total_amount"}
+TEXT_LIMITS = {"payment_mode": 50, "payment_source": 100, "ref_no": 100}
+# Amounts are numeric(15, 2)
+AMOUNT_LIMIT = Decimal(10) ** 13
+CENT = Decimal("0.01")
+
+# Common bank statement headers, matched after normalize_header()
+DEFAULT_COLUMN_MAP = {
+    **{column.replace("_", " "): column for column in PAYMENT_COLUMNS},
+    "date": "posting_date",
+    "txn date": "posting_date",
+    "transaction date": "posting_date",
+    "value date": "date_of_payment",
+    "value dt": "date_of_payment",
+    "description": "narration",
+    "particulars": "narration",
+    "remarks": "booking_remarks",
+    "ref no": "ref_no",
+    "chq ref no": "ref_no",
+    "cheque no": "ref_no",
+    "reference": "ref_no",
+    "reference no": "ref_no",
+    "utr": "ref_no",
+    "mode": "payment_mode",
+    "amount": "amount_paid",
+    "withdrawal amt": "amount_paid",
+    "debit": "amount_paid",
+    "balance": "total_amount",
+    "closing balance": "total_amount",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%d %b %Y", "%d-%b-%Y", "%d %b %y")
+
+def normalize_header(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", header.lower()).strip()
+
+def parse_date(value: str) -> Optional[date]:
+    value = value.strip()
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+def parse_amount(value: str) -> Optional[Decimal]:
+    cleaned = re.sub(r"[^0-9.\-]", "", value)
+    if not cleaned:
+        return None
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Unrecognised amount {value!r}")
+    # Checked before rounding, which fails on very long numbers
+    if abs(amount) >= AMOUNT_LIMIT or abs(amount.quantize(CENT, ROUND_HALF_UP)) >= AMOUNT_LIMIT:
+        raise ValueError(f"Amount out of range {value!r}")
+    return amount
+
+def resolve_columns(header: list, column_map: Optional[Dict[str, str]] = None) -> Dict[int, str]:
+    """Map CSV column positions onto PostingPaymentDetails fields."""
+    if column_map is not None and not isinstance(column_map, dict):
+        raise ValueError("column_map must be an object of statement header to payment field")
+    mapping = dict(DEFAULT_COLUMN_MAP)
+    for source, target in (column_map or {}).items():
+        if target not in PAYMENT_COLUMNS:
+            raise ValueError(f"Unknown payment field {target!r}")
+        mapping[normalize_header(source)] = target
+    
+    positions = {}
+    for position, name in enumerate(header):
+        target = mapping.get(normalize_header(name))
+        # First matching column wins, e.g. "Date" over a later "Value Date"
+        if target and target not in positions.values():
+            positions[position] = target
+    if not positions:
+        raise ValueError("No statement columns match a payment field")
+    return positions
+
+def _convert_row(row: list, positions: Dict[int, str], payment_source: Optional[str]) -> dict:
+    record = dict.fromkeys(PAYMENT_COLUMNS)
+    for position, column in positions.items():
+        value = row[position] if position < len(row) else ""
+        if column in DATE_COLUMNS:
+            record[column] = parse_date(value)
+        elif column in AMOUNT_COLUMNS:
+            record[column] = parse_amount(value)
+        else:
+            value = value.strip() or None
+            if value and "\x00" in value:
+                raise ValueError(f"NUL character in {column}")
+            if value and column in TEXT_LIMITS:
+                value = value[:TEXT_LIMITS[column]]
+            record[column] = value
+    if payment_source and not record["payment_source"]:
+        record["payment_source"] = payment_source[:TEXT_LIMITS["payment_source"]]
+    return record
+
+def _read_batch(reader, size: int) -> list:
+    batch = []
+    for row in reader:
+        batch.append((reader.line_num, row))
+        if len(batch) >= size:
+            break
+    return batch
+
+async def import_statement(
+    db: AsyncSession,
+    text_file,
+    column_map: Optional[Dict[str, str]] = None,
+    payment_source: Optional[str] = None,
+    batch_size: int = 5000,
+    max_errors: int = 100,
+) -> dict:
+    """Load a CSV bank statement into posting_payment_details.
+
+    Rows are read from the file batch by batch in the threadpool and fed
+    to a single COPY into a temporary staging table, so memory stays flat
+    whatever the statement size. One INSERT ... SELECT then merges the
+    staged rows, skipping ref_nos already present in the table or
+    repeated within the file. The merge takes a transaction-level lock
+    that imports queue on until the caller commits.
+    """
+    started = time.perf_counter()
+    reader = csv.reader(text_file)
+    header = await run_in_threadpool(next, reader, None)
+    if header is None:
+        raise ValueError("Statement file is empty")
+    positions = resolve_columns(header, column_map)
+    
+    stats = {"rows_read": 0, "rejected": 0}
+    errors = []
+    
+    async def records():
+        while True:
+            batch = await run_in_threadpool(_read_batch, reader, batch_size)
+            if not batch:
+                return
+            for line_no, row in batch:
+                if not any(cell.strip() for cell in row):
+                    continue
+                stats["rows_read"] += 1
+                try:
+                    record = _convert_row(row, positions, payment_source)
+                except ValueError as e:
+                    stats["rejected"] += 1
+                    if len(errors) < max_errors:
+                        errors.append({"line": line_no, "error": str(e)})
+                    continue
+                yield (line_no, *record.values())
+    
+    await db.execute(text(f"""
+        CREATE TEMP TABLE {STAGING_TABLE} (
+            line_no integer,
+            posting_date date,
+            booking_remarks text,
+            date_of_payment date,
+            payment_mode varchar(50),
+            payment_source varchar(100),
+            amount_paid numeric(15, 2),
+            total_amount numeric(15, 2),
+            ref_no varchar(100),
+            narration text,
+            doc_of_proof_url text
+        ) ON COMMIT DROP
+    """))
+    # COPY goes straight through the asyncpg connection inside the session's transaction
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    try:
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=records(), columns=("line_no", *PAYMENT_COLUMNS)
+        )
+    except asyncpg.DataError as e:
+        # Rows are checked as they are read, so this is one that slipped past
+        raise ValueError(f"Statement data rejected by the database: {e}")
+    
+    columns = ", ".join(PAYMENT_COLUMNS)
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": IMPORT_LOCK})
+    result = await db.execute(text(f"""
+        INSERT INTO posting_payment_details (id, {columns})
+        SELECT gen_random_uuid(), {columns}
+        FROM (
+            SELECT DISTINCT ON (COALESCE(ref_no, 'line:' || line_no)) *
+            FROM {STAGING_TABLE}
+            ORDER BY COALESCE(ref_no, 'line:' || line_no), line_no
+        ) staged
+        WHERE staged.ref_no IS NULL OR NOT EXISTS (
+            SELECT 1 FROM posting_payment_details existing WHERE existing.ref_no = staged.ref_no
+        )
+    """))
+    inserted = result.rowcount
+    
+    elapsed = time.perf_counter() - started
+    staged = stats["rows_read"] - stats["rejected"]
+    return {
+        "rows_read": stats["rows_read"],
+        "rows_inserted": inserted,
+        "duplicates": staged - inserted,
+        "rejected": stats["rejected"],
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(stats["rows_read"] / elapsed, 1) if elapsed else 0.0,
+    }
+
+def open_statement(binary_file) -> io.TextIOWrapper:
+    # utf-8-sig drops the BOM that bank exports from Excel often carry
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+async def _main(args):
+    from app.database import AsyncSessionLocal, async_engine
+    column_map = dict(item.split("=", 1) for item in args.map)
+    try:
+        with open(args.path, "rb") as binary_file:
+            async with AsyncSessionLocal() as db:
+                summary = await import_statement(
+                    db, open_statement(binary_file), column_map, args.source, args.batch_size
+                )
+                await db.commit()
+    finally:
+        await async_engine.dispose()
+    for error in summary.pop("errors"):
+        print(f"line {error['line']}: {error['error']}")
+    print(", ".join(f"{key}={value}" for key, value in summary.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a CSV bank statement into posting_payment_details")
+    parser.add_argument("path", help="CSV statement file")
+    parser.add_argument("--source", help="payment_source for rows that do not carry one, e.g. the bank account")
+    parser.add_argument("--map", action="append", default=[], metavar="HEADER=FIELD",
+                        help="map a statement column onto a payment field, can be repeated")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    asyncio.run(_main(parser.parse_args()))
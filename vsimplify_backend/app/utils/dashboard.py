@@ -0,0 +1,137 @@
+from collections import defaultdict
+from typing import Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.dashboard import DocumentStatusRollup, InvoiceCategoryRollup
+from app.models.document import Document
+from app.models.invoice import Invoice, InvoiceFact
+from app.models.payment import PostingPaymentDetails
+
+BANK_STATEMENT_TYPE = "bank_statement"
+
+# Document statuses counted under each invoice card figure
+INVOICE_STAGES = {
+    "submitted_processing": {"pending", "uploaded", "processing"},
+    "ready_posting": {"ready", "ready_for_posting", "verified", "processed"},
+    "posted": {"posted"},
+    "exception": {"exception", "failed", "error"},
+}
+
+# Bank statements move uploaded -> verified -> processed -> posted; each
+# figure counts the statements that have reached at least that stage
+BANK_STAGES = {
+    "verified": {"verified", "processed", "posted"},
+    "processed": {"processed", "posted"},
+    "posted": {"posted"},
+    "exceptions": {"exception", "failed", "error"},
+}
+
+def posting_bucket(category) -> str:
+    category = (category or "").lower()
+    for prefix, bucket in (("sale", "sales"), ("purchase", "purchases"), ("expense", "expenses")):
+        if category.startswith(prefix):
+            return bucket
+    return "others"
+
+async def dashboard_counters(db: AsyncSession) -> dict:
+    """Every dashboard figure but the transactions, from the rollups alone.
+
+    The trigger-maintained rollups stay a few rows per month/type/status
+    however many documents there are.
+    """
+    result = await db.execute(
+        select(DocumentStatusRollup).filter(DocumentStatusRollup.document_count > 0)
+    )
+    document_counts = result.scalars().all()
+
+    invoices = dict.fromkeys(INVOICE_STAGES, 0)
+    bank_statements = dict.fromkeys(["submitted", *BANK_STAGES], 0)
+    months = defaultdict(lambda: {"total": 0, "posted": 0})
+    for row in document_counts:
+        if row.doc_type == BANK_STATEMENT_TYPE:
+            bank_statements["submitted"] += row.document_count
+            for stage, statuses in BANK_STAGES.items():
+                if row.status in statuses:
+                    bank_statements[stage] += row.document_count
+        else:
+            for stage, statuses in INVOICE_STAGES.items():
+                if row.status in statuses:
+                    invoices[stage] += row.document_count
+        month = months[row.upload_month]
+        month["total"] += row.document_count
+        if row.status == "posted":
+            month["posted"] += row.document_count
+
+    submitted = bank_statements["submitted"]
+    bank_statements["progress"] = round(bank_statements["posted"] * 100 / submitted, 1) if submitted else 0.0
+
+    # A month's books are closed once every document uploaded in it is posted
+    closed = sum(1 for month in months.values() if month["posted"] == month["total"])
+    books = {"closed": closed, "pending": len(months) - closed}
+
+    next_posting = dict.fromkeys(["sales", "purchases", "expenses", "others"], 0.0)
+    result = await db.execute(
+        select(InvoiceCategoryRollup).filter(InvoiceCategoryRollup.invoice_count > 0)
+    )
+    for row in result.scalars():
+        next_posting[posting_bucket(row.category)] += float(row.total_amount)
+
+    return {
+        "invoices": invoices,
+        "books": books,
+        "next_posting": next_posting,
+        "bank_statements": bank_statements,
+    }
+
+async def recent_transactions(db: AsyncSession, limit: int, invoice_ids: Optional[Iterable] = None) -> List[dict]:
+    """Newest invoices as dashboard rows, optionally only those in invoice_ids"""
+    query = (
+        select(
+            Invoice.id, Invoice.created_date, Invoice.category, InvoiceFact.invoice_number,
+            InvoiceFact.supplier_name, InvoiceFact.total_amount, Document.status
+        )
+        .outerjoin(InvoiceFact, InvoiceFact.invoice_id == Invoice.id)
+        .outerjoin(Document, Document.id == Invoice.doc_id)
+        .order_by(Invoice.created_date.desc(), Invoice.id.desc())
+        .limit(limit)
+    )
+    if invoice_ids is not None:
+        query = query.filter(Invoice.id.in_(list(invoice_ids)))
+    result = await db.execute(query)
+    return [
+        {
+            "date": row.created_date.strftime("%b %d"),
+            "iso_date": row.created_date.date().isoformat(),
+            "id": row.invoice_number or str(row.id)[:8].upper(),
+            "type": (row.category or "invoice").title(),
+            "customer": row.supplier_name or "",
+            "amount": float(row.total_amount) if row.total_amount else 0.0,
+            "status": row.status or "pending",
+            "bucket": posting_bucket(row.category)
+        }
+        for row in result
+    ]
+
+async def payment_transactions(db: AsyncSession, payment_ids: Iterable) -> List[dict]:
+    """Payments in payment_ids as dashboard rows, newest first"""
+    result = await db.execute(
+        select(PostingPaymentDetails)
+        .filter(PostingPaymentDetails.id.in_(list(payment_ids)))
+        .order_by(PostingPaymentDetails.created_date.desc(), PostingPaymentDetails.id.desc())
+    )
+    rows = []
+    for payment in result.scalars():
+        day = payment.posting_date or payment.created_date.date()
+        rows.append({
+            "date": day.strftime("%b %d"),
+            "iso_date": day.isoformat(),
+            "id": payment.ref_no or str(payment.id)[:8].upper(),
+            "type": "Payment",
+            "customer": payment.payment_source or "",
+            "amount": float(payment.amount_paid) if payment.amount_paid else 0.0,
+            "status": "posted",
+            "bucket": "payments",
+            "mode": payment.payment_mode or "",
+            "narration": payment.narration or payment.booking_remarks or ""
+        })
+    return rows
@@ -1,29 +1,94 @@
+import time
+from typing import Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from app.config import settings
+from app.database import get_async_db
 from app.models.user import User
-from app.utils.auth import verify_token
+from app.utils.auth import decode_token
+from app.utils.cache import TTLCache
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_current_user(token: str = Depends(security), db: Session = Depends(get_db)):
+# token -> username, and username -> detached User snapshot. Invalidation
+# only reaches this process, so other workers may serve a changed user for
+# up to the TTL; role checks therefore always read the row.
+token_cache = TTLCache(settings.auth_cache_max_size, settings.auth_cache_ttl_seconds)
+user_cache = TTLCache(settings.auth_cache_max_size, settings.auth_cache_ttl_seconds)
+# Bumped by every invalidation, so a lookup that raced one is not cached
+_user_generation = 0
+
+def _verified_username(token: str):
+    username = token_cache.get(token)
+    if username is not None:
+        return username
+    
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    # Never keep a token around longer than it is valid
+    expires_in = payload["exp"] - time.time() if "exp" in payload else settings.auth_cache_ttl_seconds
+    if expires_in > 0:
+        token_cache.set(token, payload["sub"], ttl=expires_in)
+    return payload["sub"]
+
+def _snapshot(user: User) -> User:
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_user(*emails: str):
+    global _user_generation
+    _user_generation += 1
+    for email in emails:
+        user_cache.pop(email)
+
+async def _user_for_token(token: Optional[str], db: AsyncSession, use_cache: bool = True) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    username = verify_token(token.credentials)
+    username = _verified_username(token) if token else None
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == username).first()
+    if use_cache:
+        cached = user_cache.get(username)
+        if cached is not None:
+            # Attach a copy to this request's session without a round trip
+            return await db.merge(cached, load=False)
+    
+    generation = _user_generation
+    result = await db.execute(select(User).filter(User.email == username))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
+    if generation == _user_generation:
+        user_cache.set(username, _snapshot(user))
     return user
 
-def require_owner(current_user: User = Depends(get_current_user)):
+async def get_current_user(token: str = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    return await _user_for_token(token.credentials, db)
+
+async def get_current_user_fresh(token: str = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    """The current user read from the database, for decisions made on the role"""
+    return await _user_for_token(token.credentials, db, use_cache=False)
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # EventSource cannot set headers, so the token may come as ?token= instead
+    return await _user_for_token(credentials.credentials if credentials else token, db)
+
+async def require_owner(current_user: User = Depends(get_current_user_fresh)):
     if current_user.role != "OWNER":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,87 @@
+import os
+import re
+from typing import List, Optional
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDFs yield no text without pypdf
+    PdfReader = None
+
+# Extracted text is carried between stages in document_job.payload
+MAX_TEXT_CHARS = 200_000
+
+TEXT_EXTENSIONS = {".txt", ".csv", ".tsv", ".json", ".xml", ".html", ".htm"}
+
+BANK_STATEMENT_TYPE = "bank_statement"
+INVOICE_TYPES = {"invoice", "credit_note"}
+
+# First match wins, checked against the file name and the start of the text
+TYPE_KEYWORDS = [
+    (BANK_STATEMENT_TYPE, ("bank statement", "statement of account", "account statement")),
+    ("credit_note", ("credit note",)),
+    ("invoice", ("tax invoice", "invoice", "bill of supply")),
+    ("receipt", ("receipt",)),
+]
+
+# "Invoice Number: INV-1" or "GSTIN - 29ABCDE..." style lines
+DETAIL_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z0-9 .#/()&]{1,48}?)\s*[:\-]\s*(\S.{0,200}?)\s*$")
+MAX_DETAILS = 50
+
+# Byte order marks of the UTF-16 exports Windows tools write
+UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+def _decode(data: bytes) -> str:
+    if data.startswith(UTF16_BOMS):
+        return data.decode("utf-16", errors="replace")
+    return data.decode("utf-8", errors="replace")
+
+def _strip_nul(text: str) -> str:
+    # jsonb, where the text is carried, cannot hold NUL characters
+    return text.replace("\x00", "")
+
+def extract_text(path: str, file_name: str) -> str:
+    extension = os.path.splitext(file_name or path)[1].lower()
+    if extension == ".pdf":
+        if PdfReader is None:
+            return ""
+        pages = []
+        size = 0
+        for page in PdfReader(path).pages:
+            text = page.extract_text() or ""
+            pages.append(text)
+            size += len(text)
+            if size >= MAX_TEXT_CHARS:
+                break
+        return _strip_nul("\n".join(pages))[:MAX_TEXT_CHARS]
+    if extension in TEXT_EXTENSIONS:
+        with open(path, "rb") as file:
+            return _strip_nul(_decode(file.read(MAX_TEXT_CHARS * 4)))[:MAX_TEXT_CHARS]
+    # Images and other binaries need OCR, which is not wired in
+    return ""
+
+def classify(text: str, file_name: str, current_type: Optional[str] = None) -> str:
+    # A type given at upload is trusted over the heuristics
+    if current_type:
+        return current_type
+    haystack = f"{file_name or ''}\n{text[:5000]}".lower().replace("_", " ")
+    for doc_type, keywords in TYPE_KEYWORDS:
+        if any(keyword in haystack for keyword in keywords):
+            return doc_type
+    return "other"
+
+def draft_invoice_details(text: str) -> List[dict]:
+    """invoice_details entries for every "Label: value" line, first label wins."""
+    details = []
+    seen = set()
+    for line in _strip_nul(text).splitlines():
+        match = DETAIL_LINE.match(line)
+        if not match:
+            continue
+        label, value = match.group(1).strip(), match.group(2)
+        if label.lower() in seen:
+            continue
+        seen.add(label.lower())
+        details.append({"label": label, "value": value, "status": "active"})
+        if len(details) >= MAX_DETAILS:
+            break
+    return details
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from sqlalchemy import Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Clients must revalidate every time, but may reuse the body on a 304
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Weak ETag over row versions rather than response bytes."""
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so the W/ prefix is ignored
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has this version, else tag the response."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def list_etag(db: AsyncSession, query, id_column, version_column) -> str:
+    """ETag of a list query from its row ids and versions, without loading rows.
+
+    The query keeps its filters, ordering and limit, and only the id and
+    version columns are read. Any insert, delete or update in the result
+    changes the count, the id hash or max(version).
+    """
+    rows = query.with_only_columns(id_column, version_column).subquery()
+    row_id, version = rows.c[id_column.key], rows.c[version_column.key]
+    probe = select(
+        func.count(),
+        func.max(version),
+        func.md5(func.string_agg(cast(row_id, Text), aggregate_order_by(literal(","), row_id))),
+    )
+    return make_etag(*(await db.execute(probe)).one())
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Dict, List, Optional, Set
+import asyncpg
+from sqlalchemy.engine import make_url
+from app.config import settings
+from app.database import AsyncSessionLocal, async_database_url
+from app.utils.dashboard import dashboard_counters, payment_transactions, recent_transactions
+
+logger = logging.getLogger(__name__)
+
+# Fed by the notify_change() triggers (migration 0011)
+CHANNEL = "vsimplify_changes"
+COUNTER_TABLES = {"document", "invoice_fact"}
+TRANSACTION_TABLES = {"invoice", "posting_payment_details"}
+# New rows pushed per transactions event; larger batches only add to the counts
+MAX_NEW_ROWS = 20
+
+# Seconds between attempts to reopen the LISTEN connection
+RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+# An idle LISTEN connection is probed this often to notice a dead peer
+LISTEN_PROBE_SECONDS = 60
+
+def sse_frame(event: str, data, event_id: Optional[int] = None) -> bytes:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode()
+
+RESYNC_FRAME = sse_frame("resync", {})
+
+def changed_fields(old: dict, new: dict) -> dict:
+    """The counters sections and keys whose values differ between old and new"""
+    changes = {}
+    for section, values in new.items():
+        previous = old.get(section, {})
+        diff = {key: value for key, value in values.items() if previous.get(key) != value}
+        if diff:
+            changes[section] = diff
+    return changes
+
+class ChangeBroadcaster:
+    """Fans database changes out to /events/stream clients.
+
+    Each worker process opens one LISTEN connection, with its first
+    subscriber. A burst of notifications is coalesced into at most one
+    counters event, carrying only the figures that changed, and one
+    transactions event for the rows inserted. Each event is encoded once
+    and the same bytes are queued to every client. A client whose queue
+    fills up loses its backlog and is sent a single resync event instead,
+    so a slow reader never holds more than queue_size frames.
+    """
+
+    def __init__(self, queue_size: int, max_clients: int, coalesce_seconds: float):
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.coalesce_seconds = coalesce_seconds
+        self.subscribers: Set[asyncio.Queue] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._changed_tables: Set[str] = set()
+        self._new_ids: Dict[str, list] = {}
+        self._new_counts: Dict[str, int] = {}
+        self._counters: Optional[dict] = None
+        self._event_id = 0
+
+    def is_full(self) -> bool:
+        return len(self.subscribers) >= self.max_clients
+
+    def subscribe(self) -> asyncio.Queue:
+        if not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._dispatch())]
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, frame: bytes):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Too far behind to catch up; it refetches the snapshot instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+
+    def _publish_event(self, event: str, data):
+        self._event_id += 1
+        self.publish(sse_frame(event, data, self._event_id))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._counters = None
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            return
+        table = change.get("table")
+        self._changed_tables.add(table)
+        if table in TRANSACTION_TABLES:
+            ids = self._new_ids.setdefault(table, [])
+            ids.extend(uuid.UUID(row_id) for row_id in change.get("ids", [])[:max(MAX_NEW_ROWS - len(ids), 0)])
+            self._new_counts[table] = self._new_counts.get(table, 0) + change.get("count", 0)
+        self._wakeup.set()
+
+    async def _listen(self):
+        url = make_url(async_database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        attempt = 0
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(url)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                attempt = 0
+                # The baseline is read after LISTEN, so no change falls in between
+                async with AsyncSessionLocal() as db:
+                    self._counters = await dashboard_counters(db)
+                if reconnecting:
+                    # Whatever changed while disconnected was never notified
+                    self.publish(RESYNC_FRAME)
+                reconnecting = True
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), LISTEN_PROBE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1", timeout=10)
+                logger.warning("Change listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change listener failed, reconnecting")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            # Let the rest of a burst of commits arrive, then handle it once
+            await asyncio.sleep(self.coalesce_seconds)
+            self._wakeup.clear()
+            tables, self._changed_tables = self._changed_tables, set()
+            new_ids, self._new_ids = self._new_ids, {}
+            new_counts, self._new_counts = self._new_counts, {}
+            if not self.subscribers:
+                self._counters = None
+                continue
+            try:
+                await self._emit(tables, new_ids, new_counts)
+            except Exception:
+                logger.exception("Could not build change events")
+                self.publish(RESYNC_FRAME)
+
+    async def _emit(self, tables: Set[str], new_ids: Dict[str, list], new_counts: Dict[str, int]):
+        async with AsyncSessionLocal() as db:
+            if tables & COUNTER_TABLES:
+                counters = await dashboard_counters(db)
+                # Without a baseline every figure is sent
+                changes = changed_fields(self._counters or {}, counters)
+                self._counters = counters
+                if changes:
+                    self._publish_event("counters", changes)
+
+            rows = []
+            if new_ids.get("invoice"):
+                rows += await recent_transactions(db, MAX_NEW_ROWS, new_ids["invoice"])
+            if new_ids.get("posting_payment_details"):
+                rows += await payment_transactions(db, new_ids["posting_payment_details"])
+            if rows:
+                self._publish_event("transactions", {
+                    "transactions": rows,
+                    "new_invoices": new_counts.get("invoice", 0),
+                    "new_payments": new_counts.get("posting_payment_details", 0),
+                })
+
+broadcaster = ChangeBroadcaster(
+    settings.event_stream_queue_size, settings.event_stream_max_clients, settings.event_coalesce_seconds
+)
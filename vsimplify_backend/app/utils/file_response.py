@@ -0,0 +1,183 @@
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+from app.utils.etag import CACHE_CONTROL, etag_matches
+
+# Only for URLs that name the content hash, whose bytes can never change
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Per read when the server cannot send the file itself
+CHUNK_SIZE = 256 * 1024
+
+class RangeFileResponse(FileResponse):
+    """FileResponse for the bytes start..end (inclusive) of a file.
+
+    Servers offering the ASGI zerocopysend extension are handed the open
+    file to sendfile() from, and pathsend servers the path for whole
+    files. Otherwise the range is read off the event loop with pread.
+    """
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, path: str, stat_result: os.stat_result, start: int, end: int, **kwargs):
+        self.start = start
+        self.length = end - start + 1
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["content-length"] = str(self.length)
+        super().__init__(path, headers=headers, stat_result=stat_result, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            file = await run_in_threadpool(open, self.path, "rb")
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            finally:
+                await run_in_threadpool(file.close)
+        elif "http.response.pathsend" in extensions and self.length == self.stat_result.st_size:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            fd = await run_in_threadpool(os.open, self.path, os.O_RDONLY)
+            try:
+                offset, remaining = self.start, self.length
+                while remaining:
+                    chunk = await run_in_threadpool(os.pread, fd, min(self.chunk_size, remaining), offset)
+                    if not chunk:
+                        raise RuntimeError(f"File at path {self.path} was truncated while being sent.")
+                    offset += len(chunk)
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            finally:
+                os.close(fd)
+        if self.background is not None:
+            await self.background()
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single "bytes=" range.
+
+    Returns None when the header is to be ignored, i.e. it is malformed or
+    asks for several ranges, which are answered with the whole file.
+    Raises 416 when no byte of the file is in the range.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last) or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the last n bytes
+        start, end = max(size - int(last), 0), size - 1
+        if int(last) == 0:
+            start = size
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def _modified_since(request: Request, mtime: float) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return True
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    # HTTP dates have whole-second precision
+    return int(mtime) > since.timestamp()
+
+def _if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+    header = request.headers.get("if-range")
+    if not header:
+        return True
+    header = header.strip()
+    # If-Range uses strong comparison, so weak tags never match
+    if header.startswith('"') or header.startswith("W/"):
+        return not etag.startswith("W/") and header == etag
+    return header == last_modified
+
+async def file_response(
+    request: Request,
+    path: str,
+    filename: str,
+    etag: Optional[str] = None,
+    immutable: bool = False,
+    media_type: Optional[str] = None,
+) -> Response:
+    """Serve a stored file with conditional GET and single byte ranges.
+
+    etag must be strong; by default it is derived from the file's mtime
+    and size. immutable marks the URL as naming this exact content.
+    """
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document file not found"
+        )
+
+    size = stat_result.st_size
+    if etag is None:
+        etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    # If-Modified-Since only counts when there is no If-None-Match
+    if "if-none-match" in request.headers:
+        fresh = etag_matches(request, etag)
+    else:
+        fresh = not _modified_since(request, stat_result.st_mtime)
+    if fresh:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    start, end = 0, size - 1
+    status_code = status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if range_header and request.method == "GET" and _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    return RangeFileResponse(
+        path,
+        stat_result,
+        start,
+        end,
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        method=request.method,
+        content_disposition_type="inline",
+    )
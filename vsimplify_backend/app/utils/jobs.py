@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.document import Document
+from app.models.job import DocumentJob
+from app.schemas.job import JobStage, JobStatus
+
+PENDING = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+def enqueue_job(db: AsyncSession, document_id, stage: JobStage, payload: Optional[dict] = None) -> DocumentJob:
+    job = DocumentJob(
+        document_id=document_id,
+        stage=stage.value,
+        status=JobStatus.QUEUED.value,
+        payload=payload,
+        max_attempts=settings.job_max_attempts,
+    )
+    db.add(job)
+    return job
+
+async def has_pending_job(db: AsyncSession, document_id) -> bool:
+    result = await db.execute(
+        select(DocumentJob.id).filter(DocumentJob.document_id == document_id, DocumentJob.status.in_(PENDING)).limit(1)
+    )
+    return result.first() is not None
+
+async def fail_expired_jobs(db: AsyncSession) -> int:
+    """Fail running jobs whose lease ran out on their final attempt.
+
+    Their documents are marked "exception". Expired jobs with attempts
+    left are simply claimed again. The caller commits.
+    """
+    result = await db.execute(
+        update(DocumentJob)
+        .where(
+            DocumentJob.status == JobStatus.RUNNING.value,
+            DocumentJob.due_at <= func.now(),
+            DocumentJob.attempts >= DocumentJob.max_attempts,
+        )
+        .values(
+            status=JobStatus.FAILED.value,
+            last_error="Visibility timeout expired",
+            locked_by=None,
+            finished_at=func.now(),
+        )
+        .returning(DocumentJob.document_id)
+    )
+    document_ids = set(result.scalars())
+    if document_ids:
+        await db.execute(
+            update(Document).where(Document.id.in_(document_ids)).values(status="exception", updated_at=func.now())
+        )
+    return len(document_ids)
+
+async def claim_jobs(db: AsyncSession, worker_id: str, limit: int) -> List[DocumentJob]:
+    """Lease up to limit due jobs to worker_id; the caller commits.
+
+    FOR UPDATE SKIP LOCKED lets any number of workers poll at once without
+    waiting on, or double-claiming, each other's rows. A claimed job stays
+    invisible until its lease (settings.job_visibility_timeout) expires.
+    """
+    due = (
+        select(DocumentJob.id)
+        .filter(DocumentJob.status.in_(PENDING), DocumentJob.due_at <= func.now(),
+                DocumentJob.attempts < DocumentJob.max_attempts)
+        .order_by(DocumentJob.due_at, DocumentJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(DocumentJob)
+        .where(DocumentJob.id.in_(due.scalar_subquery()))
+        .values(
+            status=JobStatus.RUNNING.value,
+            attempts=DocumentJob.attempts + 1,
+            locked_by=worker_id,
+            due_at=func.now() + timedelta(seconds=settings.job_visibility_timeout),
+        )
+        .returning(DocumentJob)
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(result.scalars().all(), key=lambda job: job.id)
+
+async def lock_leased_job(db: AsyncSession, job: DocumentJob, worker_id: str) -> Optional[DocumentJob]:
+    """Re-read a claimed job FOR UPDATE, or None if its lease has been lost."""
+    current = await db.get(DocumentJob, job.id, with_for_update=True, populate_existing=True)
+    if (current is None or current.status != JobStatus.RUNNING.value
+            or current.locked_by != worker_id or current.attempts != job.attempts):
+        return None
+    return current
+
+def complete_job(db: AsyncSession, job: DocumentJob, finished_at: datetime,
+                 next_stage: Optional[JobStage] = None, payload: Optional[dict] = None):
+    job.status = JobStatus.DONE.value
+    job.locked_by = None
+    job.payload = None
+    job.finished_at = finished_at
+    if next_stage:
+        enqueue_job(db, job.document_id, next_stage, payload)
+
+def retry_or_fail_job(job: DocumentJob, error: str, finished_at: datetime) -> bool:
+    """Requeue with exponential backoff, or fail for good; True when failed."""
+    job.last_error = error[:2000]
+    job.locked_by = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.FAILED.value
+        job.finished_at = finished_at
+        return True
+    job.status = JobStatus.QUEUED.value
+    job.due_at = func.now() + timedelta(seconds=settings.job_retry_delay * 2 ** (job.attempts - 1))
+    return False
+
+async def job_stats(db: AsyncSession, window_minutes: int) -> dict:
+    """Backlog now, and throughput and latency per stage over the window."""
+    stages = {
+        stage.value: {
+            "queued": 0, "running": 0, "oldest_due_seconds": 0.0,
+            "done": 0, "failed": 0, "per_minute": 0.0,
+            "avg_run_ms": 0.0, "p95_run_ms": 0.0, "avg_wait_ms": 0.0,
+        }
+        for stage in JobStage
+    }
+
+    result = await db.execute(
+        select(
+            DocumentJob.stage, DocumentJob.status, func.count(),
+            func.extract("epoch", func.now() - func.min(DocumentJob.due_at)),
+        )
+        .filter(DocumentJob.status.in_(PENDING))
+        .group_by(DocumentJob.stage, DocumentJob.status)
+    )
+    for stage, status, count, oldest in result:
+        stats = stages[stage]
+        stats[status] = count
+        if status == JobStatus.QUEUED.value:
+            stats["oldest_due_seconds"] = round(max(float(oldest or 0), 0.0), 3)
+
+    run_seconds = func.extract("epoch", DocumentJob.finished_at - DocumentJob.started_at)
+    wait_seconds = func.extract("epoch", DocumentJob.started_at - DocumentJob.enqueued_at)
+    result = await db.execute(
+        select(
+            DocumentJob.stage, DocumentJob.status, func.count(),
+            func.avg(run_seconds),
+            func.percentile_cont(0.95).within_group(run_seconds),
+            func.avg(wait_seconds),
+        )
+        .filter(DocumentJob.finished_at >= func.now() - timedelta(minutes=window_minutes))
+        .group_by(DocumentJob.stage, DocumentJob.status)
+    )
+    for stage, status, count, avg_run, p95_run, avg_wait in result:
+        stats = stages[stage]
+        stats[status] = count
+        if status == JobStatus.DONE.value:
+            stats["per_minute"] = round(count / window_minutes, 3)
+            stats["avg_run_ms"] = round(float(avg_run or 0) * 1000, 3)
+            stats["p95_run_ms"] = round(float(p95_run or 0) * 1000, 3)
+            stats["avg_wait_ms"] = round(float(avg_wait or 0) * 1000, 3)
+
+    return {"window_minutes": window_minutes, "stages": stages}
@@ -0,0 +1,36 @@
+from typing import Iterable, List
+from sqlalchemy import Table, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def missing_ids(db: AsyncSession, id_column, ids: Iterable, *criteria) -> List:
+    """Ids with no row in id_column's table that also meets criteria, checked with one IN query."""
+    ids = set(ids)
+    if not ids:
+        return []
+    result = await db.execute(select(id_column).filter(id_column.in_(ids), *criteria))
+    return sorted(ids - set(result.scalars()), key=str)
+
+async def sync_links(db: AsyncSession, table: Table, owner_column: str, owner_id, target_column: str, target_ids: Iterable) -> dict:
+    """Make owner_id linked to exactly target_ids in an association table.
+
+    Reads the current links once and applies the difference as at most
+    one DELETE and one multi-row INSERT, so unchanged links are never
+    touched. The insert skips rows a concurrent request already added.
+    """
+    owner, target = table.c[owner_column], table.c[target_column]
+    target_ids = set(target_ids)
+    result = await db.execute(select(target).filter(owner == owner_id))
+    current = set(result.scalars())
+
+    removed = current - target_ids
+    added = target_ids - current
+    if removed:
+        await db.execute(table.delete().where(owner == owner_id, target.in_(removed)))
+    if added:
+        await db.execute(
+            insert(table)
+            .values([{owner_column: owner_id, target_column: target_id} for target_id in added])
+            .on_conflict_do_nothing()
+        )
+    return {"added": len(added), "removed": len(removed), "unchanged": len(current & target_ids)}
@@ -0,0 +1,38 @@
+from typing import AsyncIterator
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int) -> AsyncIterator[tuple]:
+    """Split a streamed body into (line_number, bytes) without buffering it whole.
+
+    Each chunk is split once; only a line spanning chunks is held back,
+    and one longer than max_length bytes is dropped as it arrives and
+    yielded as (line_number, None).
+    """
+    parts = []
+    size = 0
+    overlong = False
+    line_no = 0
+    async for chunk in chunks:
+        first = chunk.find(b"\n")
+        if first < 0:
+            size += len(chunk)
+            if size > max_length:
+                parts, overlong = [], True
+            elif chunk:
+                parts.append(chunk)
+            continue
+        
+        line_no += 1
+        if overlong or size + first > max_length:
+            yield line_no, None
+        else:
+            parts.append(chunk[:first])
+            yield line_no, b"".join(parts)
+        *lines, rest = chunk[first + 1:].split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line if len(line) <= max_length else None
+        size = len(rest)
+        overlong = size > max_length
+        parts = [rest] if rest and not overlong else []
+    if parts or overlong:
+        yield line_no + 1, None if overlong else b"".join(parts)
@@ -0,0 +1,77 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.etag import list_etag, not_modified
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Largest page the list endpoints accept
+MAX_LIMIT = 1000
+
+def encode_cursor(sort_value: datetime, row_id: uuid.UUID) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def page_query(query, sort_column, id_column, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """The statement paginate() runs: one page plus a probe row, newest first"""
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    elif skip:
+        query = query.offset(skip)
+    # One extra row tells us whether there is a next page
+    return query.limit(limit + 1)
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    sort_column,
+    id_column,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    request: Optional[Request] = None,
+    version_column=None,
+):
+    """Run a list query newest first, by keyset when a cursor is given.
+
+    Offset mode is kept for old clients and uses the same stable ordering,
+    so both modes hand back the cursor of the following page in the
+    X-Next-Cursor header, which is left out on the last page.
+
+    With a request and version column the page is ETagged from a cheap
+    id/version probe, and a 304 Response is returned instead of the rows
+    when the client's If-None-Match still matches.
+    """
+    query = page_query(query, sort_column, id_column, skip, limit, cursor)
+    if request is not None:
+        cached = not_modified(request, response, await list_etag(db, query, id_column, version_column))
+        if cached:
+            return cached
+    
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows
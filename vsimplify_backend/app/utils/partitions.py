@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import re
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PAYMENT_TABLE = "posting_payment_details"
+DEFAULT_PARTITION = f"{PAYMENT_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{PAYMENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PAYMENT_TABLE}_p{month:%Y_%m}"
+
+async def payment_partitions(db: AsyncSession) -> List[date]:
+    """First day of every month that has its own attached partition."""
+    result = await db.execute(text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": PAYMENT_TABLE})
+    months = []
+    for name in result.scalars():
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+async def _create_partition(db: AsyncSession, month: date):
+    name, start, end = partition_name(month), month, _next_month(month)
+    # Rows for this month may already sit in the default partition, and
+    # ATTACH refuses to run while they do, so they are moved across first.
+    # Statement triggers on the parent do not fire, so rollups are untouched.
+    await db.execute(text(f"CREATE TABLE {name} (LIKE {PAYMENT_TABLE} INCLUDING DEFAULTS)"))
+    await db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE posting_date >= :start AND posting_date < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), {"start": start, "end": end})
+    await db.execute(text(
+        f"ALTER TABLE {PAYMENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+async def ensure_payment_partitions(db: AsyncSession, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Create monthly partitions through months_ahead months from today.
+
+    Months that have collected rows in the default partition (back-dated
+    postings) get a partition of their own as well, so every dated row is
+    reachable by pruning. Safe to run concurrently; the caller commits.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": PAYMENT_TABLE})
+    existing = set(await payment_partitions(db))
+
+    result = await db.execute(text(
+        f"SELECT DISTINCT CAST(date_trunc('month', posting_date) AS date) FROM {DEFAULT_PARTITION} "
+        "WHERE posting_date IS NOT NULL"
+    ))
+    wanted = set(result.scalars())
+    month = (today or date.today()).replace(day=1)
+    for _ in range(months_ahead + 1):
+        wanted.add(month)
+        month = _next_month(month)
+
+    created = []
+    for month in sorted(wanted - existing):
+        await _create_partition(db, month)
+        created.append(partition_name(month))
+    return created
+
+async def detach_payment_partitions(db: AsyncSession, before: date) -> List[str]:
+    """Detach every monthly partition that ends on or before the given date.
+
+    Detached months stay behind as standalone tables, named as before, to
+    be dumped or dropped by the archiving job. payment_daily_rollup keeps
+    their totals, so payment summaries still cover archived months. The
+    caller commits.
+    """
+    detached = []
+    for month in await payment_partitions(db):
+        if _next_month(month) <= before:
+            await db.execute(text(f"ALTER TABLE {PAYMENT_TABLE} DETACH PARTITION {partition_name(month)}"))
+            detached.append(partition_name(month))
+    return detached
+
+async def _main(args):
+    from app.config import settings
+    from app.database import AsyncSessionLocal, async_engine
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.command == "ensure":
+                names = await ensure_payment_partitions(db, args.months_ahead or settings.payment_partition_months_ahead)
+            else:
+                names = await detach_payment_partitions(db, date.fromisoformat(args.before))
+            await db.commit()
+    finally:
+        await async_engine.dispose()
+    print(f"{args.command}: {', '.join(names) or 'nothing to do'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of posting_payment_details")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create partitions for upcoming and back-dated months")
+    ensure.add_argument("--months-ahead", type=int)
+    detach = commands.add_parser("detach", help="detach partitions for months ending on or before a date")
+    detach.add_argument("--before", required=True, help="YYYY-MM-DD, e.g. the start of the financial year")
+    asyncio.run(_main(parser.parse_args()))
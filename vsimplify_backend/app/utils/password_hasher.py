@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException, status
+from app.config import settings
+from app.utils import auth
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool, away from the request threadpool.
+
+    At most `workers` hashes run at once; callers beyond that queue on a
+    semaphore, and once `max_waiting` are queued new callers get a 503
+    rather than piling up behind a login storm. A pool left broken by a
+    worker that died is replaced and the hash retried once.
+    """
+
+    def __init__(self, workers: int, max_waiting: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor_lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+        self.total_hash_time = 0.0
+        self.pool_restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: forking a running, threaded server can copy
+        # locks held by other threads into children that then deadlock
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swap out a broken pool; callers that saw the same one share a single replacement"""
+        with self._executor_lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                self.pool_restarts += 1
+                logger.warning("password hashing pool broke, started a new one")
+            return self._executor
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            self._executor = self._new_executor()
+            self._semaphore = asyncio.Semaphore(self.workers)
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry",
+                headers={"Retry-After": "1"},
+            )
+        
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker was killed (e.g. by the OOM killer) and the pool
+                # now refuses all work, so every sign-in would fail
+                return await loop.run_in_executor(self._replace_executor(executor), fn, *args)
+        finally:
+            self._semaphore.release()
+            self.in_flight -= 1
+            finished_at = time.perf_counter()
+            self.completed += 1
+            self.total_queue_time += started_at - queued_at
+            self.max_queue_time = max(self.max_queue_time, started_at - queued_at)
+            self.total_hash_time += finished_at - started_at
+
+    async def hash(self, password: str) -> str:
+        return await self._run(auth.get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        return await self._run(auth.verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": settings.bcrypt_rounds,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "pool_restarts": self.pool_restarts,
+            "avg_queue_ms": round(self.total_queue_time / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_queue_ms": round(self.max_queue_time * 1000, 3),
+            "avg_hash_ms": round(self.total_hash_time / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._semaphore = None
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_waiting)
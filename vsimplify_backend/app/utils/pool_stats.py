@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+
+class PoolStats:
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent_waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidated = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent_waits.append(wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidated(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "invalidated_connections": self.invalidated,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p95_wait_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+def timed_pool_class(base, stats: PoolStats):
+    """Subclass a QueuePool so every checkout records how long it waited.
+
+    The stats live on the class, so they survive pool.recreate() on dispose.
+    """
+    class TimedPool(base):
+        pool_stats = stats
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                self.pool_stats.record_timeout()
+                raise
+            self.pool_stats.record_checkout(time.perf_counter() - start)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+def track_invalidations(engine, stats: PoolStats):
+    # Fired when pre-ping or an error discards a stale connection
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidated()
+
+def pool_status(pool) -> dict:
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        **pool.pool_stats.snapshot(),
+    }
@@ -0,0 +1,11 @@
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def starts_with(expression, prefix: str):
+    """expression LIKE 'prefix%', with LIKE wildcards in prefix escaped.
+
+    The default backslash escape is used rather than an ESCAPE clause, so
+    on a C-collated expression the planner turns the fixed prefix into a
+    btree range itself, for any characters the prefix ends in.
+    """
+    return expression.like(_escape_like(prefix) + "%")
@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=None)
+def schema_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+def orm_json_response(schema, content, response: Optional[Response] = None) -> Response:
+    """Validate ORM rows against schema once and encode them with pydantic-core.
+
+    Returning a Response skips FastAPI's response_model pass (a second
+    validation, jsonable_encoder and stdlib json), so the decorator's
+    response_model only documents the endpoint. Headers set on the
+    injected response (cursor, ETag) are carried over, and a Response
+    given as content, such as a 304 from paginate, is passed through.
+    """
+    if isinstance(content, Response):
+        return content
+    adapter = schema_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import uuid
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.document import DocumentBlob
+
+CHUNK_SIZE = 1024 * 1024
+
+class UploadDigest(NamedTuple):
+    sha256: str
+    size: int
+
+class ReleasedBlob(NamedTuple):
+    path: str
+    # Where the file was moved aside when this was its last reference
+    tombstone: Optional[str]
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def is_within(root: str, path: str) -> bool:
+    """Whether path, with symlinks resolved, lies inside the root directory"""
+    root = os.path.realpath(root)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+def blob_path(root: str, sha256: str) -> str:
+    # Two levels of 256-way sharding keep directories small
+    return os.path.join(root, sha256[:2], sha256[2:4], sha256)
+
+async def hash_upload(file: UploadFile, max_size: int) -> UploadDigest:
+    """Hash an upload in chunks off the event loop, enforcing max_size."""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the maximum upload size of {max_size} bytes"
+            )
+        # hashlib releases the GIL on large buffers
+        await run_in_threadpool(digest.update, chunk)
+    return UploadDigest(digest.hexdigest(), size)
+
+async def write_upload(file: UploadFile, file_path: str):
+    """Copy an upload to file_path in chunks, atomically.
+
+    Bytes go to a temporary file in the same directory which is renamed
+    into place once complete, so readers never see a partial file and a
+    failure leaves nothing behind.
+    """
+    await file.seek(0)
+    await run_in_threadpool(os.makedirs, os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    buffer = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, tmp_path, file_path)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, tmp_path)
+        raise
+
+async def remove_file(file_path: str):
+    await run_in_threadpool(_remove_quietly, file_path)
+
+async def acquire_blob(db: AsyncSession, file: UploadFile, root: str, digest: UploadDigest) -> tuple:
+    """Take a reference on the blob for an upload, writing its bytes only if missing.
+
+    The upsert row-locks the blob until the caller commits, which
+    serialises it against release_blob() dropping the same content.
+    Returns (path, created) where created tells the caller it wrote the
+    file and should remove it if the transaction does not commit.
+    """
+    path = blob_path(root, digest.sha256)
+    await db.execute(
+        insert(DocumentBlob)
+        .values(content_hash=digest.sha256, path=path, size=digest.size, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=[DocumentBlob.content_hash],
+            set_={"ref_count": DocumentBlob.ref_count + 1},
+        )
+    )
+    if await run_in_threadpool(os.path.exists, path):
+        return path, False
+    await write_upload(file, path)
+    return path, True
+
+async def release_blob(db: AsyncSession, content_hash: Optional[str]) -> Optional[ReleasedBlob]:
+    """Drop one reference to a blob, deleting its row with the last reference.
+
+    Returns None when the content is not blob-managed (documents stored
+    before the blob store existed). With the last reference the file is
+    moved aside while the row lock is held, so a concurrent acquire_blob()
+    for the same content waits and then rewrites it; once the caller has
+    committed, discard_blob() deletes it, and if the commit fails
+    restore_blob() puts it back.
+    """
+    if not content_hash:
+        return None
+    result = await db.execute(
+        update(DocumentBlob)
+        .where(DocumentBlob.content_hash == content_hash)
+        .values(ref_count=DocumentBlob.ref_count - 1)
+        .returning(DocumentBlob.ref_count, DocumentBlob.path)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    if row.ref_count > 0:
+        return ReleasedBlob(row.path, None)
+    await db.execute(delete(DocumentBlob).where(DocumentBlob.content_hash == content_hash))
+    tombstone = f"{row.path}.{uuid.uuid4().hex}.released"
+    try:
+        await run_in_threadpool(os.replace, row.path, tombstone)
+    except FileNotFoundError:
+        tombstone = None
+    return ReleasedBlob(row.path, tombstone)
+
+async def discard_blob(released: Optional[ReleasedBlob]):
+    if released is not None and released.tombstone:
+        await remove_file(released.tombstone)
+
+async def restore_blob(released: Optional[ReleasedBlob]):
+    if released is not None and released.tombstone:
+        await run_in_threadpool(os.replace, released.tombstone, released.path)
@@ -0,0 +1,185 @@
+"""Document processing worker: python -m app.worker [--processes N] [--once]
+
+Each process polls document_job with FOR UPDATE SKIP LOCKED, so any
+number of processes, on any number of hosts, can share the queue. A
+document moves uploaded -> processing through the stages
+
+    extract_text -> classify -> draft_invoice (invoices and credit notes)
+
+and ends "ready_for_posting" (drafted invoice), "verified" (bank
+statement), "processed" (anything else) or "exception" once a stage has
+used up its attempts.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from datetime import datetime, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.models.document import Document
+from app.models.invoice import Invoice
+from app.models.job import DocumentJob
+from app.schemas.job import JobStage
+from app.utils import document_processing
+from app.utils.jobs import claim_jobs, complete_job, fail_expired_jobs, lock_leased_job, retry_or_fail_job
+
+logger = logging.getLogger("app.worker")
+
+async def _run_stage(job: DocumentJob, document: Document) -> dict:
+    """Do a stage's work outside any transaction; returns what to apply."""
+    payload = job.payload or {}
+    if job.stage == JobStage.EXTRACT_TEXT.value:
+        text = await run_in_threadpool(document_processing.extract_text, document.file_url, document.file_name)
+        return {"next_stage": JobStage.CLASSIFY, "payload": {"text": text}}
+    if job.stage == JobStage.CLASSIFY.value:
+        doc_type = document_processing.classify(payload.get("text", ""), document.file_name, document.type)
+        if doc_type in document_processing.INVOICE_TYPES:
+            return {"type": doc_type, "next_stage": JobStage.DRAFT_INVOICE, "payload": payload}
+        status = "verified" if doc_type == document_processing.BANK_STATEMENT_TYPE else "processed"
+        return {"type": doc_type, "status": status}
+    if job.stage == JobStage.DRAFT_INVOICE.value:
+        details = document_processing.draft_invoice_details(payload.get("text", ""))
+        return {"invoice_details": details, "status": "ready_for_posting"}
+    raise ValueError(f"Unknown stage {job.stage}")
+
+async def _apply(db, job: DocumentJob, document: Document, outcome: dict, finished_at: datetime):
+    if "type" in outcome:
+        document.type = outcome["type"]
+    if "status" in outcome:
+        document.status = outcome["status"]
+    if "invoice_details" in outcome:
+        # A retried stage may already have drafted this document's invoice
+        result = await db.execute(select(Invoice.id).filter(Invoice.doc_id == document.id).limit(1))
+        if result.first() is None:
+            db.add(Invoice(doc_id=document.id, invoice_details=outcome["invoice_details"]))
+    complete_job(db, job, finished_at, outcome.get("next_stage"), outcome.get("payload"))
+
+async def process_job(job: DocumentJob, worker_id: str):
+    async with AsyncSessionLocal() as db:
+        document = await db.get(Document, job.document_id)
+        # No transaction is held open while the stage runs
+        await db.commit()
+        error = None
+        outcome = None
+        started_at = datetime.now(timezone.utc)
+        if document is not None:
+            try:
+                outcome = await _run_stage(job, document)
+            except Exception as e:
+                logger.exception("job %s (%s) failed on attempt %s", job.id, job.stage, job.attempts)
+                error = f"{type(e).__name__}: {e}"
+        finished_at = datetime.now(timezone.utc)
+
+        leased = await lock_leased_job(db, job, worker_id)
+        if leased is None:
+            # Lease expired mid-stage and the job was reclaimed; drop the result
+            logger.warning("job %s lost its lease, result discarded", job.id)
+            return
+        # Timed here rather than at claim, so batch-mates' work is not counted
+        leased.started_at = started_at
+        document = await db.get(Document, job.document_id, with_for_update=True, populate_existing=True)
+        if document is None:
+            complete_job(db, leased, finished_at)
+        elif error is not None:
+            if retry_or_fail_job(leased, error, finished_at):
+                document.status = "exception"
+        else:
+            await _apply(db, leased, document, outcome, finished_at)
+        await db.commit()
+
+async def _record_failure(job: DocumentJob, worker_id: str, error: str):
+    """Retry or fail a job whose result could not be saved."""
+    async with AsyncSessionLocal() as db:
+        leased = await lock_leased_job(db, job, worker_id)
+        if leased is None:
+            return
+        if retry_or_fail_job(leased, error, datetime.now(timezone.utc)):
+            document = await db.get(Document, job.document_id, with_for_update=True)
+            if document is not None:
+                document.status = "exception"
+        await db.commit()
+
+async def run_worker(worker_id: str, batch_size: int, once: bool, stop: asyncio.Event):
+    while not stop.is_set():
+        async with AsyncSessionLocal() as db:
+            await fail_expired_jobs(db)
+            jobs = await claim_jobs(db, worker_id, batch_size)
+            for job in jobs:
+                # The first stage marks the document as in progress
+                if job.stage == JobStage.EXTRACT_TEXT.value:
+                    document = await db.get(Document, job.document_id)
+                    if document is not None:
+                        document.status = "processing"
+            await db.commit()
+
+        for job in jobs:
+            try:
+                await process_job(job, worker_id)
+            except Exception as e:
+                # One bad document must not take the worker down; its
+                # session has been rolled back on the way out
+                logger.exception("job %s (%s) could not be saved", job.id, job.stage)
+                try:
+                    await _record_failure(job, worker_id, f"{type(e).__name__}: {e}")
+                except Exception:
+                    # Left to expire and be claimed again
+                    logger.exception("job %s could not be marked failed", job.id)
+            if stop.is_set():
+                break
+
+        if not jobs:
+            if once:
+                return
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.job_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+async def _serve(batch_size: int, once: bool):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # Finish the job in hand, then exit
+        loop.add_signal_handler(sig, stop.set)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("worker %s started", worker_id)
+    try:
+        await run_worker(worker_id, batch_size, once, stop)
+    finally:
+        await async_engine.dispose()
+
+def _process_main(batch_size: int, once: bool):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s[%(process)d] %(levelname)s %(message)s")
+    asyncio.run(_serve(batch_size, once))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued documents")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes)
+    parser.add_argument("--batch-size", type=int, default=settings.worker_batch_size,
+                        help="jobs leased per poll by each process")
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _process_main(args.batch_size, args.once)
+    else:
+        # spawn, not fork: each process must open its own connection pool
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=_process_main, args=(args.batch_size, args.once))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
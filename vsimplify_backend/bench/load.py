@@ -0,0 +1,95 @@
+"""HTTP load benchmark for an authenticated list endpoint.
+
+Drives an already running API with a fixed number of concurrent clients
+per level and reports requests/s and latency percentiles. Only the HTTP
+API is used, so the same script measures any revision of the backend:
+it registers an owner, logs in and seeds suppliers before the first
+level. When the server has /health/db, the async pool's checkout waits
+are printed after each level too.
+
+    python -m bench.load --url http://127.0.0.1:8000 --clients 50 200 1000
+
+Figures for the sync session path (e2db2af~1) against the async one
+(e2db2af) are in bench/RESULTS.txt.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+import httpx
+
+async def _setup(client: httpx.AsyncClient, seed: int) -> dict:
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    response = await client.post("/auth/register", json={"name": "Bench", "email": email, "role": "OWNER", "password": "bench"})
+    response.raise_for_status()
+    response = await client.post("/auth/login", data={"username": email, "password": "bench"})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for i in range(seed):
+        response = await client.post("/suppliers/", json={"name": f"Bench supplier {i}", "gst_status": "registered"}, headers=headers)
+        response.raise_for_status()
+    return headers
+
+async def _client(client: httpx.AsyncClient, path: str, headers: dict, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000 if ordered else 0.0
+
+async def run_level(url: str, path: str, headers: dict, clients: int, seconds: float) -> dict:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        latencies, errors = [], []
+        start = time.perf_counter()
+        deadline = start + seconds
+        await asyncio.gather(*(_client(client, path, headers, deadline, latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        pool = None
+        try:
+            response = await client.get("/health/db")
+            if response.status_code == 200:
+                pool = response.json().get("async_pool")
+        except httpx.HTTPError:
+            pass
+    return {
+        "clients": clients,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p99_ms": _percentile(latencies, 0.99),
+        "errors": Counter(errors),
+        "pool": pool,
+    }
+
+async def main(url: str, path: str, levels: list, seconds: float, seed: int):
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        headers = await _setup(client, seed)
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}  pool checkout wait / failures")
+    for clients in levels:
+        result = await run_level(url, path, headers, clients, seconds)
+        pool = result["pool"]
+        wait = f"p95 {pool['p95_wait_ms']} ms, max {pool['max_wait_ms']} ms, {pool['timeouts']} timeouts" if pool else "n/a"
+        errors = result["errors"]
+        failures = ", ".join(f"{count} x {error}" for error, count in errors.most_common())
+        print(f"{result['clients']:>8} {result['requests_per_second']:>8.1f} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {sum(errors.values()):>7}  {wait}" + (f" / {failures}" if failures else ""))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure requests/s of a list endpoint at several concurrency levels")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/suppliers/?limit=20")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--seconds", type=float, default=20, help="duration of each level")
+    parser.add_argument("--seed", type=int, default=100, help="suppliers created before the first level")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.path, args.clients, args.seconds, args.seed))
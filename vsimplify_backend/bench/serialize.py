@@ -0,0 +1,122 @@
+"""Microbenchmark of the list response path, per response schema.
+
+Times 100-row pages of transient ORM objects through FastAPI's
+response_model path (serialize_response, then JSONResponse with the
+stdlib encoder) and through orm_json_response, and checks that both
+produce the same JSON. The two paths run in alternating rounds and the
+best round of each is reported, which keeps a noisy box from favouring
+either. No database is needed.
+
+    python -m bench.serialize --iterations 200 --rounds 5
+
+Recorded figures are in bench/RESULTS.txt.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.company import Company
+from app.models.document import Document
+from app.models.invoice import Invoice
+from app.models.payment import PostingPaymentDetails
+from app.models.supplier import Supplier
+from app.models.user import User, UserRole
+from app.schemas.company import CompanyResponse
+from app.schemas.document import DocumentResponse
+from app.schemas.invoice import InvoiceResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.supplier import SupplierResponse
+from app.schemas.user import UserResponse
+from app.utils.responses import orm_json_response
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+def _invoice(i):
+    details = [
+        {"label": "Invoice Number", "value": f"INV-{i:05d}", "status": "active"},
+        {"label": "Invoice Date", "value": "17/10/2026", "status": "active"},
+        {"label": "Supplier Name", "value": f"Supplier {i}", "status": "active"},
+        {"label": "GSTIN", "value": f"27AAAPL{i:04d}C1ZV", "status": "active"},
+        {"label": "Taxable Amount", "value": f"{i * 100}.00", "status": "active"},
+        {"label": "CGST", "value": f"{i * 9}.00", "status": "active"},
+        {"label": "SGST", "value": f"{i * 9}.00", "status": "active"},
+        {"label": "Total Amount", "value": f"{i * 118}.00", "status": "active"},
+    ]
+    return Invoice(id=uuid.uuid4(), doc_id=uuid.uuid4(), category="Purchase", accounting_type="Expense",
+                   invoice_details=details, created_date=NOW, updated_at=NOW)
+
+def _document(i):
+    return Document(id=uuid.uuid4(), file_name=f"invoice-{i}.pdf", file_url=f"uploads/invoice-{i}.pdf", status="processed",
+                    type="invoice", party_name=f"Supplier {i}", content_hash="0" * 64, file_size=120000 + i,
+                    upload_date=NOW, created_at=NOW, updated_at=NOW)
+
+def _supplier(i):
+    return Supplier(id=uuid.uuid4(), name=f"Supplier {i}", ledger_name=f"Ledger {i}", currency_type="INR",
+                    gst_status="registered", gst=f"27AAAPL{i:04d}C1ZV",
+                    address={"line1": f"{i} Main Road", "city": "Pune", "pin": "411001"}, created_date=NOW, updated_at=NOW)
+
+def _payment(i):
+    return PostingPaymentDetails(id=uuid.uuid4(), posting_date=date(2026, 10, 17), booking_remarks="Booked",
+                                 date_of_payment=date(2026, 10, 16), payment_mode="NEFT", payment_source="HDFC",
+                                 amount_paid=Decimal(f"{i * 118}.50"), total_amount=Decimal(f"{i * 118}.50"),
+                                 ref_no=f"REF{i:08d}", narration=f"Payment to supplier {i}",
+                                 doc_of_proof_url=f"uploads/proof-{i}.pdf", created_date=NOW, updated_at=NOW)
+
+def _user(i):
+    return User(id=uuid.uuid4(), name=f"User {i}", email=f"user{i}@example.com", phone_no="9800000000",
+                location="Pune", password="x", role=UserRole.ACCOUNTANT, created_date=NOW, updated_at=NOW)
+
+def _company(i):
+    return Company(id=uuid.uuid4(), name=f"Company {i}", email=f"accounts{i}@example.com",
+                   location={"city": "Pune"}, base_currency="INR", gst_number=f"27AAAPL{i:04d}C1ZV",
+                   accounting_month=4, contact_person={"name": "Contact", "phone": "9800000000"}, created_at=NOW)
+
+SCHEMAS = [
+    (InvoiceResponse, _invoice),
+    (DocumentResponse, _document),
+    (SupplierResponse, _supplier),
+    (PaymentResponse, _payment),
+    (UserResponse, _user),
+    (CompanyResponse, _company),
+]
+
+async def _response_model_body(field, rows):
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+def _rows_per_second(render, rows, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(rows)
+    return len(rows) * iterations / (time.perf_counter() - start)
+
+def main(rows: int, iterations: int, rounds: int):
+    loop = asyncio.new_event_loop()
+    print(f"{'schema':<18} {'response_model':>15} {'orm_json_response':>18}  rows/s")
+    for schema, make in SCHEMAS:
+        page = [make(i) for i in range(1, rows + 1)]
+        field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema], mode="serialization")
+        before = lambda page: loop.run_until_complete(_response_model_body(field, page))
+        after = lambda page: orm_json_response(List[schema], page).body
+        assert json.loads(before(page)) == json.loads(after(page)), schema.__name__
+        best_before = best_after = 0.0
+        for _ in range(rounds):
+            best_before = max(best_before, _rows_per_second(before, page, iterations))
+            best_after = max(best_after, _rows_per_second(after, page, iterations))
+        print(f"{schema.__name__:<18} {best_before:>15,.0f} {best_after:>18,.0f}")
+    loop.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare rows/s of the two list response paths")
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--iterations", type=int, default=200, help="pages rendered per round")
+    parser.add_argument("--rounds", type=int, default=5, help="alternating rounds per path and schema")
+    args = parser.parse_args()
+    main(args.rows, args.iterations, args.rounds)
@@ -0,0 +1,59 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401 registers every table on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Autogenerate cannot compare expression indexes; they are managed by hand
+EXPRESSION_INDEXES = {
+    "uq_payment_daily_rollup_key",
+    "uq_document_status_rollup_key",
+    "uq_invoice_category_rollup_key",
+    "ix_supplier_name_prefix",
+    "ix_supplier_ledger_name_prefix",
+    "ix_company_name_prefix",
+    "ix_document_party_name_prefix",
+    # Only built where pg_trgm is available, so not declared on the models
+    "ix_supplier_name_trgm",
+    "ix_supplier_ledger_name_trgm",
+    "ix_company_name_trgm",
+    "ix_document_party_name_trgm",
+}
+
+# Partitions (and detached archive months) are managed by app.utils.partitions
+PARTITION_PREFIXES = ("posting_payment_details_",)
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and reflected and compare_to is None and name.startswith(PARTITION_PREFIXES):
+        return False
+    return not (type_ == "index" and name in EXPRESSION_INDEXES)
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connectable = create_engine(settings.database_url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,218 @@
+"""Baseline schema, as previously created by Base.metadata.create_all
+
+Databases that were bootstrapped by create_all are brought up to date in
+place: existing tables are left alone and only what is missing is added.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+PAYMENT_ROLLUP_TRIGGERS = """
+CREATE OR REPLACE FUNCTION payment_rollup_apply() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO payment_daily_rollup
+            (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+        SELECT posting_date, NULLIF(payment_mode, ''), NULLIF(payment_source, ''),
+               count(*), COALESCE(sum(amount_paid), 0), COALESCE(sum(total_amount), 0)
+        FROM new_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT ((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))
+        DO UPDATE SET payment_count = payment_daily_rollup.payment_count + EXCLUDED.payment_count,
+                      amount_paid = payment_daily_rollup.amount_paid + EXCLUDED.amount_paid,
+                      total_amount = payment_daily_rollup.total_amount + EXCLUDED.total_amount;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO payment_daily_rollup
+            (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+        SELECT posting_date, NULLIF(payment_mode, ''), NULLIF(payment_source, ''),
+               -count(*), -COALESCE(sum(amount_paid), 0), -COALESCE(sum(total_amount), 0)
+        FROM old_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT ((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))
+        DO UPDATE SET payment_count = payment_daily_rollup.payment_count + EXCLUDED.payment_count,
+                      amount_paid = payment_daily_rollup.amount_paid + EXCLUDED.amount_paid,
+                      total_amount = payment_daily_rollup.total_amount + EXCLUDED.total_amount;
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS payment_rollup_insert ON posting_payment_details;
+DROP TRIGGER IF EXISTS payment_rollup_update ON posting_payment_details;
+DROP TRIGGER IF EXISTS payment_rollup_delete ON posting_payment_details;
+CREATE TRIGGER payment_rollup_insert AFTER INSERT ON posting_payment_details
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+CREATE TRIGGER payment_rollup_update AFTER UPDATE ON posting_payment_details
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+CREATE TRIGGER payment_rollup_delete AFTER DELETE ON posting_payment_details
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+"""
+
+PAYMENT_ROLLUP_BACKFILL = """
+INSERT INTO payment_daily_rollup
+    (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+SELECT posting_date, NULLIF(payment_mode, ''), NULLIF(payment_source, ''),
+       count(*), COALESCE(sum(amount_paid), 0), COALESCE(sum(total_amount), 0)
+FROM posting_payment_details
+GROUP BY 1, 2, 3
+"""
+
+def _timestamps(*names):
+    return [sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now()) for name in names]
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False, unique=True),
+            sa.Column("phone_no", sa.String(20)),
+            sa.Column("location", sa.String(255)),
+            sa.Column("password", sa.String(255), nullable=False),
+            sa.Column("role", sa.Enum("OWNER", "ACCOUNTANT", name="userrole"), nullable=False),
+            *_timestamps("created_date", "updated_at"),
+        )
+    
+    if "company" not in existing:
+        op.create_table(
+            "company",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("email", sa.String(255)),
+            sa.Column("location", JSONB),
+            sa.Column("base_currency", sa.String(10)),
+            sa.Column("gst_number", sa.String(50)),
+            sa.Column("accounting_month", sa.Integer),
+            sa.Column("contact_person", JSONB),
+            *_timestamps("created_at", "updated_at"),
+        )
+    
+    if "company_user_relation" not in existing:
+        op.create_table(
+            "company_user_relation",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("company_id", UUID(as_uuid=True), sa.ForeignKey("company.id", ondelete="CASCADE")),
+            sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+            *_timestamps("created_at"),
+        )
+    
+    if "document" not in existing:
+        op.create_table(
+            "document",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("file_name", sa.String(255), nullable=False),
+            sa.Column("file_url", sa.Text, nullable=False),
+            sa.Column("status", sa.String(50)),
+            sa.Column("type", sa.String(100)),
+            sa.Column("party_name", sa.String(255)),
+            sa.Column("content_hash", sa.String(64)),
+            sa.Column("file_size", sa.BigInteger),
+            *_timestamps("upload_date", "created_at"),
+        )
+    else:
+        # Columns added after the create_all days
+        op.execute("ALTER TABLE document ADD COLUMN IF NOT EXISTS content_hash varchar(64)")
+        op.execute("ALTER TABLE document ADD COLUMN IF NOT EXISTS file_size bigint")
+    
+    if "document_blob" not in existing:
+        op.create_table(
+            "document_blob",
+            sa.Column("content_hash", sa.String(64), primary_key=True),
+            sa.Column("path", sa.Text, nullable=False),
+            sa.Column("size", sa.BigInteger, nullable=False),
+            sa.Column("ref_count", sa.Integer, nullable=False),
+            *_timestamps("created_at"),
+        )
+    
+    if "invoice" not in existing:
+        op.create_table(
+            "invoice",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("doc_id", UUID(as_uuid=True), sa.ForeignKey("document.id", ondelete="SET NULL")),
+            sa.Column("category", sa.String(100)),
+            sa.Column("accounting_type", sa.String(100)),
+            sa.Column("invoice_details", JSONB),
+            *_timestamps("created_date", "updated_at"),
+        )
+    
+    if "supplier" not in existing:
+        op.create_table(
+            "supplier",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("ledger_name", sa.String(255)),
+            sa.Column("currency_type", sa.String(10)),
+            sa.Column("gst_status", sa.String(20)),
+            sa.Column("gst", sa.String(50)),
+            sa.Column("address", JSONB),
+            *_timestamps("created_date", "updated_at"),
+        )
+    
+    if "company_supplier_relation" not in existing:
+        op.create_table(
+            "company_supplier_relation",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("company_id", UUID(as_uuid=True), sa.ForeignKey("company.id", ondelete="CASCADE")),
+            sa.Column("supplier_id", UUID(as_uuid=True), sa.ForeignKey("supplier.id", ondelete="CASCADE")),
+            *_timestamps("created_at"),
+        )
+    
+    if "posting_payment_details" not in existing:
+        op.create_table(
+            "posting_payment_details",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True),
+            sa.Column("posting_date", sa.Date),
+            sa.Column("booking_remarks", sa.Text),
+            sa.Column("date_of_payment", sa.Date),
+            sa.Column("payment_mode", sa.String(50)),
+            sa.Column("payment_source", sa.String(100)),
+            sa.Column("amount_paid", sa.DECIMAL(15, 2)),
+            sa.Column("total_amount", sa.DECIMAL(15, 2)),
+            sa.Column("ref_no", sa.String(100)),
+            sa.Column("narration", sa.Text),
+            sa.Column("doc_of_proof_url", sa.Text),
+            *_timestamps("created_date", "updated_at"),
+        )
+    
+    if "payment_daily_rollup" not in existing:
+        op.create_table(
+            "payment_daily_rollup",
+            sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+            sa.Column("posting_date", sa.Date),
+            sa.Column("payment_mode", sa.String(50)),
+            sa.Column("payment_source", sa.String(100)),
+            sa.Column("payment_count", sa.BigInteger, nullable=False),
+            sa.Column("amount_paid", sa.DECIMAL(17, 2), nullable=False),
+            sa.Column("total_amount", sa.DECIMAL(17, 2), nullable=False),
+        )
+        op.execute(
+            "CREATE UNIQUE INDEX uq_payment_daily_rollup_key ON payment_daily_rollup "
+            "((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))"
+        )
+        op.execute(PAYMENT_ROLLUP_TRIGGERS)
+        op.execute(PAYMENT_ROLLUP_BACKFILL)
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS payment_rollup_insert ON posting_payment_details")
+    op.execute("DROP TRIGGER IF EXISTS payment_rollup_update ON posting_payment_details")
+    op.execute("DROP TRIGGER IF EXISTS payment_rollup_delete ON posting_payment_details")
+    op.execute("DROP FUNCTION IF EXISTS payment_rollup_apply()")
+    for table in (
+        "payment_daily_rollup", "posting_payment_details", "company_supplier_relation", "supplier",
+        "invoice", "document_blob", "document", "company_user_relation", "company", "users",
+    ):
+        op.drop_table(table)
+    op.execute("DROP TYPE IF EXISTS userrole")
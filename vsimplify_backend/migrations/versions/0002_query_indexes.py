@@ -0,0 +1,50 @@
+"""Indexes matching the list filters and keyset sort of each router
+
+Every list endpoint pages on (sort column, id) descending, optionally after
+an equality filter, so each filter gets a composite (filter, sort, id)
+index. Built CONCURRENTLY so an existing deployment keeps serving writes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_document_upload_date_id", "document", "upload_date, id"),
+    ("ix_document_status_upload_date_id", "document", "status, upload_date, id"),
+    ("ix_document_type_upload_date_id", "document", "type, upload_date, id"),
+    ("ix_invoice_created_date_id", "invoice", "created_date, id"),
+    ("ix_invoice_category_created_date_id", "invoice", "category, created_date, id"),
+    ("ix_invoice_accounting_type_created_date_id", "invoice", "accounting_type, created_date, id"),
+    ("ix_invoice_doc_id", "invoice", "doc_id"),
+    ("ix_posting_payment_details_created_date_id", "posting_payment_details", "created_date, id"),
+    ("ix_posting_payment_details_mode_created_date_id", "posting_payment_details", "payment_mode, created_date, id"),
+    ("ix_posting_payment_details_source_created_date_id", "posting_payment_details", "payment_source, created_date, id"),
+    ("ix_posting_payment_details_posting_date", "posting_payment_details", "posting_date"),
+    ("ix_posting_payment_details_ref_no", "posting_payment_details", "ref_no"),
+    ("ix_supplier_created_date_id", "supplier", "created_date, id"),
+    ("ix_supplier_currency_type_created_date_id", "supplier", "currency_type, created_date, id"),
+    ("ix_supplier_gst_status_created_date_id", "supplier", "gst_status, created_date, id"),
+    ("ix_users_created_date_id", "users", "created_date, id"),
+    ("ix_users_role_created_date_id", "users", "role, created_date, id"),
+    ("ix_company_user_relation_company_id", "company_user_relation", "company_id"),
+    ("ix_company_user_relation_user_id", "company_user_relation", "user_id"),
+    ("ix_company_supplier_relation_company_id", "company_supplier_relation", "company_id"),
+    ("ix_company_supplier_relation_supplier_id", "company_supplier_relation", "supplier_id"),
+]
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,70 @@
+"""Searchable projection of invoice.invoice_details
+
+invoice_detail holds one row per label/value pair and is rebuilt by
+statement-level triggers whenever invoices are inserted or updated, so
+the ORM, the NDJSON bulk insert and raw SQL all keep it in sync.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Values are capped at 1000 characters so a pasted blob can never exceed
+# the btree row size and fail the invoice write.
+PROJECT_DETAILS = r"""
+INSERT INTO invoice_detail (invoice_id, position, label, value, numeric_value)
+SELECT i.id, d.position, left(lower(btrim(d.element->>'label')), 255), left(d.element->>'value', 1000),
+       CASE WHEN d.element->>'value' ~ '^\s*(\u20b9|Rs\.?|INR|\$)?\s*-?[0-9][0-9,]*(\.[0-9]+)?\s*$'
+            THEN replace(substring(d.element->>'value' from '-?[0-9][0-9,]*(?:\.[0-9]+)?'), ',', '')::numeric(20, 4)
+       END
+FROM {source} i
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(i.invoice_details) = 'array' THEN i.invoice_details ELSE '[]'::jsonb END
+) WITH ORDINALITY AS d(element, position)
+WHERE jsonb_typeof(d.element) = 'object' AND d.element->>'label' IS NOT NULL
+"""
+
+INVOICE_DETAIL_TRIGGERS = """
+CREATE OR REPLACE FUNCTION invoice_detail_sync() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM invoice_detail WHERE invoice_id IN (SELECT id FROM old_rows);
+    END IF;
+    %s;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+
+CREATE TRIGGER invoice_detail_insert AFTER INSERT ON invoice
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION invoice_detail_sync();
+CREATE TRIGGER invoice_detail_update AFTER UPDATE ON invoice
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION invoice_detail_sync();
+""" % PROJECT_DETAILS.format(source="new_rows").strip()
+
+def upgrade():
+    op.create_table(
+        "invoice_detail",
+        sa.Column("invoice_id", UUID(as_uuid=True), sa.ForeignKey("invoice.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("position", sa.Integer, primary_key=True),
+        sa.Column("label", sa.String(255), nullable=False),
+        sa.Column("value", sa.Text(collation="C")),
+        sa.Column("numeric_value", sa.DECIMAL(20, 4)),
+    )
+    op.execute(PROJECT_DETAILS.format(source="invoice"))
+    op.create_index("ix_invoice_detail_label_value", "invoice_detail", ["label", "value"])
+    op.create_index("ix_invoice_detail_label_numeric_value", "invoice_detail", ["label", "numeric_value"])
+    op.execute(INVOICE_DETAIL_TRIGGERS)
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS invoice_detail_insert ON invoice")
+    op.execute("DROP TRIGGER IF EXISTS invoice_detail_update ON invoice")
+    op.execute("DROP FUNCTION IF EXISTS invoice_detail_sync()")
+    op.drop_table("invoice_detail")
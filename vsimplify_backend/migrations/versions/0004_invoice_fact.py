@@ -0,0 +1,134 @@
+"""Typed invoice facts for spend aggregation
+
+invoice_fact holds one row per invoice with the header fields parsed out
+of its invoice_detail rows. Its triggers are named so they fire after the
+invoice_detail ones (same-event triggers run in name order), so the
+detail rows they read are already current.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# invoice_detail labels (lower-cased) that feed each typed field, by priority
+LABELS = {
+    "invoice_number": ["invoice number", "invoice no", "invoice no.", "invoice #", "bill number", "bill no"],
+    "invoice_date": ["invoice date", "bill date", "date"],
+    "supplier_name": ["supplier name", "supplier", "vendor name", "vendor", "seller name", "party name"],
+    "gstin": ["gstin", "supplier gstin", "gst number", "gst no"],
+    "taxable_amount": ["taxable amount", "taxable value", "sub total", "subtotal", "net amount"],
+    "tax_amount": ["tax amount", "total tax", "gst amount"],
+    "tax_component": ["cgst", "sgst", "igst", "cess", "cgst amount", "sgst amount", "igst amount", "cess amount"],
+    "total_amount": ["total amount", "grand total", "invoice total", "invoice amount", "total", "amount payable"],
+}
+
+def _labels(field):
+    return "ARRAY[%s]" % ", ".join("'%s'" % label for label in LABELS[field])
+
+def _first(column, field):
+    return "(array_agg(d.%s ORDER BY array_position(%s, d.label::text), d.position) FILTER (WHERE d.label = ANY(%s)))[1]" % (
+        column, _labels(field), _labels(field)
+    )
+
+# Dates are read as ISO or as Indian day-first; anything else stays NULL
+PARSE_DATE = r"""
+CREATE OR REPLACE FUNCTION invoice_parse_date(raw text) RETURNS date AS $body$
+DECLARE
+    value text := btrim(raw);
+BEGIN
+    IF value ~ '^\d{4}-\d{1,2}-\d{1,2}$' THEN
+        RETURN to_date(value, 'YYYY-MM-DD');
+    ELSIF value ~ '^\d{1,2}[/.-]\d{1,2}[/.-]\d{4}$' THEN
+        RETURN to_date(translate(value, '/.', '--'), 'DD-MM-YYYY');
+    ELSIF value ~ '^\d{1,2}[ -][A-Za-z]{3}[ -]\d{4}$' THEN
+        RETURN to_date(translate(value, '-', ' '), 'DD Mon YYYY');
+    END IF;
+    RETURN NULL;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql IMMUTABLE;
+"""
+
+PROJECT_FACTS = """
+INSERT INTO invoice_fact (invoice_id, category, accounting_type, invoice_number, invoice_date, accounting_date,
+                          supplier_name, gstin, taxable_amount, tax_amount, total_amount)
+SELECT facts.id, facts.category, facts.accounting_type, left(facts.invoice_number, 100), facts.invoice_date,
+       COALESCE(facts.invoice_date, facts.created_date::date),
+       left(facts.supplier_name, 255), left(facts.gstin, 50),
+       facts.taxable_amount, facts.tax_amount, facts.total_amount
+FROM (
+    SELECT i.id, i.category, i.accounting_type, i.created_date,
+           {invoice_number} AS invoice_number,
+           invoice_parse_date({invoice_date}) AS invoice_date,
+           {supplier_name} AS supplier_name,
+           {gstin} AS gstin,
+           {taxable_amount} AS taxable_amount,
+           COALESCE({tax_amount}, sum(d.numeric_value) FILTER (WHERE d.label = ANY({tax_components}))) AS tax_amount,
+           {total_amount} AS total_amount
+    FROM {{source}} i
+    LEFT JOIN invoice_detail d ON d.invoice_id = i.id
+    GROUP BY i.id, i.category, i.accounting_type, i.created_date
+) facts
+""".format(
+    invoice_number=_first("value", "invoice_number"),
+    invoice_date=_first("value", "invoice_date"),
+    supplier_name=_first("value", "supplier_name"),
+    gstin=_first("value", "gstin"),
+    taxable_amount=_first("numeric_value", "taxable_amount"),
+    tax_amount=_first("numeric_value", "tax_amount"),
+    tax_components=_labels("tax_component"),
+    total_amount=_first("numeric_value", "total_amount"),
+)
+
+INVOICE_FACT_TRIGGERS = """
+CREATE OR REPLACE FUNCTION invoice_fact_sync() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM invoice_fact WHERE invoice_id IN (SELECT id FROM old_rows);
+    END IF;
+    %s;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+
+CREATE TRIGGER invoice_fact_insert AFTER INSERT ON invoice
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION invoice_fact_sync();
+CREATE TRIGGER invoice_fact_update AFTER UPDATE ON invoice
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION invoice_fact_sync();
+""" % PROJECT_FACTS.format(source="new_rows").strip()
+
+def upgrade():
+    op.create_table(
+        "invoice_fact",
+        sa.Column("invoice_id", UUID(as_uuid=True), sa.ForeignKey("invoice.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category", sa.String(100)),
+        sa.Column("accounting_type", sa.String(100)),
+        sa.Column("invoice_number", sa.String(100)),
+        sa.Column("invoice_date", sa.Date),
+        sa.Column("accounting_date", sa.Date, nullable=False),
+        sa.Column("supplier_name", sa.String(255)),
+        sa.Column("gstin", sa.String(50)),
+        sa.Column("taxable_amount", sa.DECIMAL(18, 2)),
+        sa.Column("tax_amount", sa.DECIMAL(18, 2)),
+        sa.Column("total_amount", sa.DECIMAL(18, 2)),
+    )
+    op.execute(PARSE_DATE)
+    op.execute(PROJECT_FACTS.format(source="invoice"))
+    op.create_index("ix_invoice_fact_accounting_date", "invoice_fact", ["accounting_date"])
+    op.execute(INVOICE_FACT_TRIGGERS)
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS invoice_fact_insert ON invoice")
+    op.execute("DROP TRIGGER IF EXISTS invoice_fact_update ON invoice")
+    op.execute("DROP FUNCTION IF EXISTS invoice_fact_sync()")
+    op.execute("DROP FUNCTION IF EXISTS invoice_parse_date(text)")
+    op.drop_table("invoice_fact")
@@ -0,0 +1,103 @@
+"""Trigger-maintained rollups behind the dashboard snapshot
+
+document_status_rollup counts documents per (upload month, type, status)
+and invoice_category_rollup sums invoice_fact per category. Both are
+applied as signed deltas from statement-level triggers, like
+payment_daily_rollup, and backfilled here.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+DOCUMENT_DELTA = """
+INSERT INTO document_status_rollup (upload_month, doc_type, status, document_count)
+SELECT date_trunc('month', upload_date AT TIME ZONE 'UTC')::date, type, status, {sign}count(*)
+FROM {source}
+GROUP BY 1, 2, 3
+ON CONFLICT ((COALESCE(upload_month, DATE '0001-01-01')), (COALESCE(doc_type, '')), (COALESCE(status, '')))
+DO UPDATE SET document_count = document_status_rollup.document_count + EXCLUDED.document_count
+"""
+
+INVOICE_DELTA = """
+INSERT INTO invoice_category_rollup (category, invoice_count, total_amount)
+SELECT category, {sign}count(*), {sign}COALESCE(sum(total_amount), 0)
+FROM {source}
+GROUP BY 1
+ON CONFLICT ((COALESCE(category, '')))
+DO UPDATE SET invoice_count = invoice_category_rollup.invoice_count + EXCLUDED.invoice_count,
+              total_amount = invoice_category_rollup.total_amount + EXCLUDED.total_amount
+"""
+
+def _triggers(table, function, delta):
+    return """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {add};
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {remove};
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {function}_insert AFTER INSERT ON {table}
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+CREATE TRIGGER {function}_update AFTER UPDATE ON {table}
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+CREATE TRIGGER {function}_delete AFTER DELETE ON {table}
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+""".format(
+        table=table,
+        function=function,
+        add=delta.format(sign="", source="new_rows").strip(),
+        remove=delta.format(sign="-", source="old_rows").strip(),
+    )
+
+def upgrade():
+    op.create_table(
+        "document_status_rollup",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("upload_month", sa.Date),
+        sa.Column("doc_type", sa.String(100)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("document_count", sa.BigInteger, nullable=False),
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX uq_document_status_rollup_key ON document_status_rollup "
+        "((COALESCE(upload_month, DATE '0001-01-01')), (COALESCE(doc_type, '')), (COALESCE(status, '')))"
+    )
+    op.create_table(
+        "invoice_category_rollup",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("category", sa.String(100)),
+        sa.Column("invoice_count", sa.BigInteger, nullable=False),
+        sa.Column("total_amount", sa.DECIMAL(20, 2), nullable=False),
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX uq_invoice_category_rollup_key ON invoice_category_rollup ((COALESCE(category, '')))"
+    )
+    op.execute(_triggers("document", "document_status_rollup_apply", DOCUMENT_DELTA))
+    op.execute(_triggers("invoice_fact", "invoice_category_rollup_apply", INVOICE_DELTA))
+    op.execute(DOCUMENT_DELTA.format(sign="", source="document"))
+    op.execute(INVOICE_DELTA.format(sign="", source="invoice_fact"))
+
+def downgrade():
+    for table, function in (
+        ("document", "document_status_rollup_apply"),
+        ("invoice_fact", "invoice_category_rollup_apply"),
+    ):
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {function}_{event} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+    op.drop_table("invoice_category_rollup")
+    op.drop_table("document_status_rollup")
@@ -0,0 +1,22 @@
+"""Track document.updated_at for ETags
+
+Existing rows start from their creation time.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("document", sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.execute("UPDATE document SET updated_at = COALESCE(created_at, upload_date, updated_at)")
+
+def downgrade():
+    op.drop_column("document", "updated_at")
@@ -0,0 +1,55 @@
+"""Prefix and trigram indexes for /search/typeahead
+
+Each searched name gets a C-collated btree on lower(name), which serves
+prefix matches as an index range in name order. Where the pg_trgm
+extension is available it is enabled and each name also gets a GiST
+trigram index, which serves both the % similarity filter and the <->
+distance ordering, so fuzzy top-N is read straight off the index.
+Without pg_trgm only the prefix indexes are built and typeahead returns
+prefix matches only. Downgrade leaves the extension installed, as
+other objects may depend on it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+NAME_COLUMNS = [
+    ("supplier_name", "supplier", "name"),
+    ("supplier_ledger_name", "supplier", "ledger_name"),
+    ("company_name", "company", "name"),
+    ("document_party_name", "document", "party_name"),
+]
+
+def upgrade():
+    bind = op.get_bind()
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, column in NAME_COLUMNS:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{name}_prefix '
+                f'ON {table} ((lower({column}) COLLATE "C"))'
+            )
+            if available:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{name}_trgm "
+                    f"ON {table} USING gist (lower({column}) gist_trgm_ops)"
+                )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(NAME_COLUMNS):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{name}_trgm")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{name}_prefix")
@@ -0,0 +1,43 @@
+"""One row per company link
+
+Link writes now diff against current rows and insert with ON CONFLICT DO
+NOTHING, which needs a unique (company_id, member) index. Duplicate links
+left by the old delete-and-reinsert writes are removed first, keeping the
+oldest. The new indexes lead with company_id, so the plain company_id
+indexes from 0002 are dropped.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+RELATIONS = [
+    ("company_user_relation", "user_id"),
+    ("company_supplier_relation", "supplier_id"),
+]
+
+def upgrade():
+    for table, member in RELATIONS:
+        op.execute(f"""
+            DELETE FROM {table} t
+            USING (
+                SELECT id, row_number() OVER (
+                    PARTITION BY company_id, {member} ORDER BY created_at, id
+                ) AS n
+                FROM {table}
+            ) d
+            WHERE t.id = d.id AND d.n > 1
+        """)
+        op.create_index(f"uq_{table}_company_id_{member}", table, ["company_id", member], unique=True)
+        op.drop_index(f"ix_{table}_company_id", table_name=table)
+
+def downgrade():
+    for table, member in reversed(RELATIONS):
+        op.create_index(f"ix_{table}_company_id", table, ["company_id"])
+        op.drop_index(f"uq_{table}_company_id_{member}", table_name=table)
@@ -0,0 +1,112 @@
+"""Range-partition posting_payment_details by month of posting_date
+
+The table is rebuilt as a partitioned table with one partition per month
+that has rows, the current month and the next three, plus a DEFAULT
+partition for NULL posting dates and months without a partition yet.
+app.utils.partitions creates later months and detaches archived ones.
+
+A primary key on a partitioned table must include the partition key,
+and posting_date is nullable, so id loses its primary key constraint and
+keeps a plain index. Ids remain uuid4. The rollup triggers are recreated
+on the new table after the copy, so payment_daily_rollup is unchanged.
+The copy rewrites the table; run it in a maintenance window.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLE = "posting_payment_details"
+MONTHS_AHEAD = 3
+
+COLUMNS = """
+    id uuid NOT NULL,
+    posting_date date,
+    booking_remarks text,
+    date_of_payment date,
+    payment_mode varchar(50),
+    payment_source varchar(100),
+    amount_paid numeric(15, 2),
+    total_amount numeric(15, 2),
+    ref_no varchar(100),
+    narration text,
+    doc_of_proof_url text,
+    created_date timestamp with time zone DEFAULT now(),
+    updated_at timestamp with time zone DEFAULT now()
+"""
+
+COLUMN_NAMES = ", ".join(line.split()[0] for line in COLUMNS.strip().splitlines())
+
+INDEXES = [
+    ("ix_posting_payment_details_created_date_id", "created_date, id"),
+    ("ix_posting_payment_details_mode_created_date_id", "payment_mode, created_date, id"),
+    ("ix_posting_payment_details_source_created_date_id", "payment_source, created_date, id"),
+    ("ix_posting_payment_details_posting_date", "posting_date"),
+    ("ix_posting_payment_details_ref_no", "ref_no"),
+]
+
+ROLLUP_TRIGGERS = f"""
+CREATE TRIGGER payment_rollup_insert AFTER INSERT ON {TABLE}
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+CREATE TRIGGER payment_rollup_update AFTER UPDATE ON {TABLE}
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+CREATE TRIGGER payment_rollup_delete AFTER DELETE ON {TABLE}
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION payment_rollup_apply();
+"""
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def _retire_old_table():
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+    for trigger in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS payment_rollup_{trigger} ON {TABLE}_old")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+def _create_indexes(*extra):
+    for name, columns in [*INDEXES, *extra]:
+        op.execute(f"CREATE INDEX {name} ON {TABLE} ({columns})")
+
+def upgrade():
+    bind = op.get_bind()
+    _retire_old_table()
+
+    op.execute(f"CREATE TABLE {TABLE} ({COLUMNS}) PARTITION BY RANGE (posting_date)")
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    months = set(bind.execute(sa.text(
+        f"SELECT DISTINCT date_trunc('month', posting_date)::date FROM {TABLE}_old WHERE posting_date IS NOT NULL"
+    )).scalars())
+    month = date.today().replace(day=1)
+    for _ in range(MONTHS_AHEAD + 1):
+        months.add(month)
+        month = _next_month(month)
+    for month in sorted(months):
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+        )
+
+    op.execute(f"INSERT INTO {TABLE} ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM {TABLE}_old")
+    op.execute(f"DROP TABLE {TABLE}_old")
+    _create_indexes(("ix_posting_payment_details_id", "id"))
+    op.execute(ROLLUP_TRIGGERS)
+
+def downgrade():
+    _retire_old_table()
+    op.execute("DROP INDEX IF EXISTS ix_posting_payment_details_id")
+
+    op.execute(f"CREATE TABLE {TABLE} ({COLUMNS}, PRIMARY KEY (id))")
+    op.execute(f"INSERT INTO {TABLE} ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM {TABLE}_old")
+    op.execute(f"DROP TABLE {TABLE}_old")
+    _create_indexes()
+    op.execute(ROLLUP_TRIGGERS)
@@ -0,0 +1,48 @@
+"""document_job queue for app.worker
+
+Documents already waiting in status "uploaded" are queued for their
+first stage, so the worker picks up the existing backlog.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "document_job",
+        sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("document.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("stage", sa.String(30), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("payload", JSONB),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("max_attempts", sa.Integer, nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_by", sa.String(100)),
+        sa.Column("last_error", sa.Text),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "ix_document_job_due", "document_job", ["due_at"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+    op.create_index("ix_document_job_document_id", "document_job", ["document_id"])
+    op.create_index("ix_document_job_stage_finished_at", "document_job", ["stage", "finished_at"])
+    op.execute("""
+        INSERT INTO document_job (document_id, stage, status, attempts, max_attempts)
+        SELECT id, 'extract_text', 'queued', 0, 3 FROM document WHERE status = 'uploaded'
+    """)
+
+def downgrade():
+    op.drop_table("document_job")
@@ -0,0 +1,64 @@
+"""NOTIFY vsimplify_changes on document, invoice and payment writes
+
+One notification per statement, delivered on commit, feeds the
+/events/stream listener. document and invoice_fact only say which table
+changed. Inserts into invoice and posting_payment_details also carry
+the row count and the first ids, so new transactions can be pushed.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# Ids per notification; pg_notify payloads are capped at 8000 bytes
+MAX_IDS = 20
+
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_change() RETURNS trigger AS $body$
+DECLARE
+    payload json;
+BEGIN
+    IF TG_ARGV[0] = 'ids' THEN
+        SELECT json_build_object(
+            'table', TG_TABLE_NAME, 'op', TG_OP, 'count', count(*),
+            'ids', (SELECT json_agg(id) FROM (SELECT id FROM new_rows LIMIT {max_ids}) AS first_rows)
+        )
+        INTO payload FROM new_rows HAVING count(*) > 0;
+        IF payload IS NULL THEN
+            RETURN NULL;
+        END IF;
+    ELSE
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP);
+    END IF;
+    PERFORM pg_notify('vsimplify_changes', payload::text);
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""".format(max_ids=MAX_IDS)
+
+# (table, events, REFERENCING clause, function argument)
+TRIGGERS = [
+    ("document", "INSERT OR UPDATE OF status, type, upload_date OR DELETE", "", ""),
+    ("invoice_fact", "INSERT OR UPDATE OR DELETE", "", ""),
+    ("invoice", "INSERT", "REFERENCING NEW TABLE AS new_rows", "'ids'"),
+    ("posting_payment_details", "INSERT", "REFERENCING NEW TABLE AS new_rows", "'ids'"),
+]
+
+def upgrade():
+    op.execute(NOTIFY_FUNCTION)
+    for table, events, referencing, argument in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {table}_notify_change AFTER {events} ON {table} {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION notify_change({argument})"
+        )
+
+def downgrade():
+    for table, *_ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_change()")
@@ -0,0 +1,141 @@
+"""Keep out-of-range detail amounts from failing invoice writes
+
+Detail values that read as a number were cast straight to
+numeric(20, 4), so a long digit string such as a bank account number
+failed the invoice INSERT/UPDATE with numeric field overflow, as did
+fact amounts past numeric(18, 2). The trigger functions of 0003 and
+0004 are replaced with versions that store such values as NULL;
+downgrade puts the 0003/0004 definitions back.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+DETAIL_FUNCTION = """
+CREATE OR REPLACE FUNCTION invoice_detail_sync() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM invoice_detail WHERE invoice_id IN (SELECT id FROM old_rows);
+    END IF;
+    %s;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+"""
+
+# As in 0003: numbers cast straight to numeric(20, 4)
+PREVIOUS_PROJECT_DETAILS = r"""
+INSERT INTO invoice_detail (invoice_id, position, label, value, numeric_value)
+SELECT i.id, d.position, left(lower(btrim(d.element->>'label')), 255), left(d.element->>'value', 1000),
+       CASE WHEN d.element->>'value' ~ '^\s*(\u20b9|Rs\.?|INR|\$)?\s*-?[0-9][0-9,]*(\.[0-9]+)?\s*$'
+            THEN replace(substring(d.element->>'value' from '-?[0-9][0-9,]*(?:\.[0-9]+)?'), ',', '')::numeric(20, 4)
+       END
+FROM new_rows i
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(i.invoice_details) = 'array' THEN i.invoice_details ELSE '[]'::jsonb END
+) WITH ORDINALITY AS d(element, position)
+WHERE jsonb_typeof(d.element) = 'object' AND d.element->>'label' IS NOT NULL
+"""
+
+# A value that reads as a number is parsed as unconstrained numeric, which
+# its bounded digit runs always fit, and kept only if it fits numeric_value
+# once rounded, so an account number or similar long digit string is
+# stored as text alone
+PROJECT_DETAILS = r"""
+INSERT INTO invoice_detail (invoice_id, position, label, value, numeric_value)
+SELECT i.id, d.position, left(lower(btrim(d.element->>'label')), 255), left(d.element->>'value', 1000),
+       CASE WHEN abs(round(parsed.amount, 4)) < 1e16 THEN parsed.amount END
+FROM new_rows i
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(i.invoice_details) = 'array' THEN i.invoice_details ELSE '[]'::jsonb END
+) WITH ORDINALITY AS d(element, position)
+CROSS JOIN LATERAL (
+    SELECT CASE WHEN d.element->>'value' ~ '^\s*(\u20b9|Rs\.?|INR|\$)?\s*-?[0-9][0-9,]{0,99}(\.[0-9]{1,100})?\s*$'
+                THEN replace(substring(d.element->>'value' from '-?[0-9][0-9,]*(?:\.[0-9]+)?'), ',', '')::numeric
+           END AS amount
+) parsed
+WHERE jsonb_typeof(d.element) = 'object' AND d.element->>'label' IS NOT NULL
+"""
+
+# invoice_detail labels (lower-cased) that feed each typed field, by priority, as in 0004
+LABELS = {
+    "invoice_number": ["invoice number", "invoice no", "invoice no.", "invoice #", "bill number", "bill no"],
+    "invoice_date": ["invoice date", "bill date", "date"],
+    "supplier_name": ["supplier name", "supplier", "vendor name", "vendor", "seller name", "party name"],
+    "gstin": ["gstin", "supplier gstin", "gst number", "gst no"],
+    "taxable_amount": ["taxable amount", "taxable value", "sub total", "subtotal", "net amount"],
+    "tax_amount": ["tax amount", "total tax", "gst amount"],
+    "tax_component": ["cgst", "sgst", "igst", "cess", "cgst amount", "sgst amount", "igst amount", "cess amount"],
+    "total_amount": ["total amount", "grand total", "invoice total", "invoice amount", "total", "amount payable"],
+}
+
+def _labels(field):
+    return "ARRAY[%s]" % ", ".join("'%s'" % label for label in LABELS[field])
+
+def _first(column, field):
+    return "(array_agg(d.%s ORDER BY array_position(%s, d.label::text), d.position) FILTER (WHERE d.label = ANY(%s)))[1]" % (
+        column, _labels(field), _labels(field)
+    )
+
+def _amount(column):
+    # Amounts that would overflow numeric(18, 2) once rounded, e.g. a long
+    # digit string summed as a tax component, stay NULL instead of failing
+    return "CASE WHEN abs(round(facts.{0}, 2)) < 1e16 THEN facts.{0} END".format(column)
+
+FACT_FUNCTION = """
+CREATE OR REPLACE FUNCTION invoice_fact_sync() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM invoice_fact WHERE invoice_id IN (SELECT id FROM old_rows);
+    END IF;
+    INSERT INTO invoice_fact (invoice_id, category, accounting_type, invoice_number, invoice_date, accounting_date,
+                              supplier_name, gstin, taxable_amount, tax_amount, total_amount)
+    SELECT facts.id, facts.category, facts.accounting_type, left(facts.invoice_number, 100), facts.invoice_date,
+           COALESCE(facts.invoice_date, facts.created_date::date),
+           left(facts.supplier_name, 255), left(facts.gstin, 50),
+           {amounts}
+    FROM (
+        SELECT i.id, i.category, i.accounting_type, i.created_date,
+               {invoice_number} AS invoice_number,
+               invoice_parse_date({invoice_date}) AS invoice_date,
+               {supplier_name} AS supplier_name,
+               {gstin} AS gstin,
+               {taxable_amount} AS taxable_amount,
+               COALESCE({tax_amount}, sum(d.numeric_value) FILTER (WHERE d.label = ANY({tax_components}))) AS tax_amount,
+               {total_amount} AS total_amount
+        FROM new_rows i
+        LEFT JOIN invoice_detail d ON d.invoice_id = i.id
+        GROUP BY i.id, i.category, i.accounting_type, i.created_date
+    ) facts;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+"""
+
+def _fact_function(amounts):
+    return FACT_FUNCTION.format(
+        amounts=amounts,
+        invoice_number=_first("value", "invoice_number"),
+        invoice_date=_first("value", "invoice_date"),
+        supplier_name=_first("value", "supplier_name"),
+        gstin=_first("value", "gstin"),
+        taxable_amount=_first("numeric_value", "taxable_amount"),
+        tax_amount=_first("numeric_value", "tax_amount"),
+        tax_components=_labels("tax_component"),
+        total_amount=_first("numeric_value", "total_amount"),
+    )
+
+def upgrade():
+    op.execute(DETAIL_FUNCTION % PROJECT_DETAILS.strip())
+    op.execute(_fact_function(", ".join(_amount(column) for column in ("taxable_amount", "tax_amount", "total_amount"))))
+
+def downgrade():
+    op.execute(DETAIL_FUNCTION % PREVIOUS_PROJECT_DETAILS.strip())
+    op.execute(_fact_function("facts.taxable_amount, facts.tax_amount, facts.total_amount"))
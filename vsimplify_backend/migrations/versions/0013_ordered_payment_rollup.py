@@ -0,0 +1,103 @@
+"""Apply payment rollup deltas as one upsert locked in key order
+
+Every payment write upserts the payment_daily_rollup row of its
+(posting_date, mode, source), so concurrent writers to the same day
+queue on that one row until the first commits; that serialization is
+inherent to keeping the rollup exact. What could go wrong on top of it
+was deadlock: a multi-row statement spanning several days locked their
+rows in hash-aggregate order, and an UPDATE locked the new keys, then
+the old ones, in a second statement. Additions and removals are now
+netted into a single upsert ordered by the unique key, so every
+statement takes its row locks in the same order, and keys whose net
+change is zero (an update that moves no money between days) are not
+written at all.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+ROW_DELTA = """
+        SELECT posting_date, NULLIF(payment_mode, '') AS payment_mode, NULLIF(payment_source, '') AS payment_source,
+               {sign}1 AS payment_count, {sign}COALESCE(amount_paid, 0) AS amount_paid,
+               {sign}COALESCE(total_amount, 0) AS total_amount
+        FROM {source}"""
+
+UPSERT = """
+        INSERT INTO payment_daily_rollup
+            (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+        SELECT posting_date, payment_mode, payment_source, sum(payment_count), sum(amount_paid), sum(total_amount)
+        FROM ({deltas}
+        ) deltas
+        GROUP BY 1, 2, 3
+        HAVING sum(payment_count) <> 0 OR sum(amount_paid) <> 0 OR sum(total_amount) <> 0
+        ORDER BY COALESCE(posting_date, DATE '0001-01-01'), COALESCE(payment_mode, ''), COALESCE(payment_source, '')
+        ON CONFLICT ((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))
+        DO UPDATE SET payment_count = payment_daily_rollup.payment_count + EXCLUDED.payment_count,
+                      amount_paid = payment_daily_rollup.amount_paid + EXCLUDED.amount_paid,
+                      total_amount = payment_daily_rollup.total_amount + EXCLUDED.total_amount"""
+
+def _upsert(*deltas):
+    return UPSERT.format(deltas="\n        UNION ALL".join(ROW_DELTA.format(sign=sign, source=source) for sign, source in deltas))
+
+# Transition tables only exist for the events that have them
+PAYMENT_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION payment_rollup_apply() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{insert};
+    ELSIF TG_OP = 'UPDATE' THEN{update};
+    ELSE{delete};
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""".format(
+    insert=_upsert(("", "new_rows")),
+    update=_upsert(("", "new_rows"), ("-", "old_rows")),
+    delete=_upsert(("-", "old_rows")),
+)
+
+# As installed by 0001
+PREVIOUS_PAYMENT_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION payment_rollup_apply() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO payment_daily_rollup
+            (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+        SELECT posting_date, NULLIF(payment_mode, ''), NULLIF(payment_source, ''),
+               count(*), COALESCE(sum(amount_paid), 0), COALESCE(sum(total_amount), 0)
+        FROM new_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT ((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))
+        DO UPDATE SET payment_count = payment_daily_rollup.payment_count + EXCLUDED.payment_count,
+                      amount_paid = payment_daily_rollup.amount_paid + EXCLUDED.amount_paid,
+                      total_amount = payment_daily_rollup.total_amount + EXCLUDED.total_amount;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO payment_daily_rollup
+            (posting_date, payment_mode, payment_source, payment_count, amount_paid, total_amount)
+        SELECT posting_date, NULLIF(payment_mode, ''), NULLIF(payment_source, ''),
+               -count(*), -COALESCE(sum(amount_paid), 0), -COALESCE(sum(total_amount), 0)
+        FROM old_rows
+        GROUP BY 1, 2, 3
+        ON CONFLICT ((COALESCE(posting_date, DATE '0001-01-01')), (COALESCE(payment_mode, '')), (COALESCE(payment_source, '')))
+        DO UPDATE SET payment_count = payment_daily_rollup.payment_count + EXCLUDED.payment_count,
+                      amount_paid = payment_daily_rollup.amount_paid + EXCLUDED.amount_paid,
+                      total_amount = payment_daily_rollup.total_amount + EXCLUDED.total_amount;
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+"""
+
+def upgrade():
+    op.execute(PAYMENT_ROLLUP_FUNCTION)
+
+def downgrade():
+    op.execute(PREVIOUS_PAYMENT_ROLLUP_FUNCTION)
@@ -0,0 +1,128 @@
+"""Apply dashboard rollup deltas as one upsert locked in key order
+
+As 0013 does for payments: the 0005 trigger functions upserted
+new_rows and old_rows in two statements in hash-aggregate order, so a
+document whose status changed locked the new status row, then the old
+one, while a concurrent change the other way locked them in reverse.
+Each statement's additions and removals are now netted into a single
+upsert ordered by the unique key, and keys with no net change are not
+written, so the many document UPDATEs that leave month, type and status
+alone no longer touch document_status_rollup at all. Writers that do
+change the same key still queue on its row until the first commits.
+
+invoice_category_rollup is fed by invoice_fact_sync, which replaces an
+updated invoice's fact with a DELETE and then an INSERT; moving an
+invoice to another category therefore still locks the two category
+rows in separate statements.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+DOCUMENT_ROWS = """
+        SELECT date_trunc('month', upload_date AT TIME ZONE 'UTC')::date AS upload_month, type AS doc_type, status,
+               {sign}1 AS document_count
+        FROM {source}"""
+
+DOCUMENT_UPSERT = """
+        INSERT INTO document_status_rollup (upload_month, doc_type, status, document_count)
+        SELECT upload_month, doc_type, status, sum(document_count)
+        FROM ({deltas}
+        ) deltas
+        GROUP BY 1, 2, 3
+        HAVING sum(document_count) <> 0
+        ORDER BY COALESCE(upload_month, DATE '0001-01-01'), COALESCE(doc_type, ''), COALESCE(status, '')
+        ON CONFLICT ((COALESCE(upload_month, DATE '0001-01-01')), (COALESCE(doc_type, '')), (COALESCE(status, '')))
+        DO UPDATE SET document_count = document_status_rollup.document_count + EXCLUDED.document_count"""
+
+INVOICE_ROWS = """
+        SELECT category, {sign}1 AS invoice_count, {sign}COALESCE(total_amount, 0) AS total_amount
+        FROM {source}"""
+
+INVOICE_UPSERT = """
+        INSERT INTO invoice_category_rollup (category, invoice_count, total_amount)
+        SELECT category, sum(invoice_count), sum(total_amount)
+        FROM ({deltas}
+        ) deltas
+        GROUP BY 1
+        HAVING sum(invoice_count) <> 0 OR sum(total_amount) <> 0
+        ORDER BY COALESCE(category, '')
+        ON CONFLICT ((COALESCE(category, '')))
+        DO UPDATE SET invoice_count = invoice_category_rollup.invoice_count + EXCLUDED.invoice_count,
+                      total_amount = invoice_category_rollup.total_amount + EXCLUDED.total_amount"""
+
+def _upsert(upsert, rows, *deltas):
+    return upsert.format(deltas="\n        UNION ALL".join(rows.format(sign=sign, source=source) for sign, source in deltas))
+
+# Transition tables only exist for the events that have them
+def _function(function, upsert, rows):
+    return """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP = 'INSERT' THEN{insert};
+    ELSIF TG_OP = 'UPDATE' THEN{update};
+    ELSE{delete};
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""".format(
+        function=function,
+        insert=_upsert(upsert, rows, ("", "new_rows")),
+        update=_upsert(upsert, rows, ("", "new_rows"), ("-", "old_rows")),
+        delete=_upsert(upsert, rows, ("-", "old_rows")),
+    )
+
+# As installed by 0005
+PREVIOUS_DOCUMENT_DELTA = """
+INSERT INTO document_status_rollup (upload_month, doc_type, status, document_count)
+SELECT date_trunc('month', upload_date AT TIME ZONE 'UTC')::date, type, status, {sign}count(*)
+FROM {source}
+GROUP BY 1, 2, 3
+ON CONFLICT ((COALESCE(upload_month, DATE '0001-01-01')), (COALESCE(doc_type, '')), (COALESCE(status, '')))
+DO UPDATE SET document_count = document_status_rollup.document_count + EXCLUDED.document_count
+"""
+
+PREVIOUS_INVOICE_DELTA = """
+INSERT INTO invoice_category_rollup (category, invoice_count, total_amount)
+SELECT category, {sign}count(*), {sign}COALESCE(sum(total_amount), 0)
+FROM {source}
+GROUP BY 1
+ON CONFLICT ((COALESCE(category, '')))
+DO UPDATE SET invoice_count = invoice_category_rollup.invoice_count + EXCLUDED.invoice_count,
+              total_amount = invoice_category_rollup.total_amount + EXCLUDED.total_amount
+"""
+
+def _previous_function(function, delta):
+    return """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $body$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {add};
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {remove};
+    END IF;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""".format(
+        function=function,
+        add=delta.format(sign="", source="new_rows").strip(),
+        remove=delta.format(sign="-", source="old_rows").strip(),
+    )
+
+def upgrade():
+    op.execute(_function("document_status_rollup_apply", DOCUMENT_UPSERT, DOCUMENT_ROWS))
+    op.execute(_function("invoice_category_rollup_apply", INVOICE_UPSERT, INVOICE_ROWS))
+
+def downgrade():
+    op.execute(_previous_function("document_status_rollup_apply", PREVIOUS_DOCUMENT_DELTA))
+    op.execute(_previous_function("invoice_category_rollup_apply", PREVIOUS_INVOICE_DELTA))
@@ -0,0 +1,5 @@
+import os
+
+# Settings are read at import; the app only connects once a query runs
+os.environ.setdefault("DATABASE_URL", "postgresql://postgres@localhost:5432/vsimplify")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
@@ -0,0 +1,35 @@
+import uuid
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_async_db
+from app.main import app
+from app.utils.dependencies import get_current_user, get_current_user_fresh
+
+CHANGES = {"add": [{"company_id": str(uuid.uuid4()), "member_id": str(uuid.uuid4())}], "remove": []}
+
+async def _no_db():
+    yield None
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_async_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("relation", ["company-users", "company-suppliers"])
+def test_accountant_cannot_change_links(client, relation):
+    app.dependency_overrides[get_current_user_fresh] = lambda: SimpleNamespace(role="ACCOUNTANT")
+    response = client.post(f"/links/{relation}", json=CHANGES)
+    assert response.status_code == 403
+
+def test_role_is_read_fresh(client):
+    # A cached user still showing OWNER after a demotion must not pass
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role="OWNER")
+    app.dependency_overrides[get_current_user_fresh] = lambda: SimpleNamespace(role="ACCOUNTANT")
+    response = client.post("/links/company-users", json=CHANGES)
+    assert response.status_code == 403
+
+def test_links_need_a_token(client):
+    response = client.post("/links/company-users", json=CHANGES)
+    assert response.status_code == 403
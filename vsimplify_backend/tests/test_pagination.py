@@ -0,0 +1,36 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.database import get_async_db
+from app.main import app
+from app.utils.dependencies import get_current_user, require_owner
+from app.utils.pagination import MAX_LIMIT
+
+LIST_PATHS = [
+    "/documents/",
+    "/invoices/",
+    "/invoices/search?label=GSTIN",
+    "/payments/",
+    "/suppliers/",
+    "/users/",
+    "/users/accountants",
+]
+
+async def _no_db():
+    yield None
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_async_db] = _no_db
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[require_owner] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def _with_params(path, params):
+    return path + ("&" if "?" in path else "?") + params
+
+@pytest.mark.parametrize("path", LIST_PATHS)
+@pytest.mark.parametrize("params", ["limit=0", "limit=-1", f"limit={MAX_LIMIT + 1}", "skip=-1"])
+def test_out_of_range_paging_is_rejected(client, path, params):
+    response = client.get(_with_params(path, params))
+    assert response.status_code == 422
@@ -0,0 +1,23 @@
+import asyncio
+import os
+import signal
+from app.utils.password_hasher import PasswordHasher
+
+def test_hashing_survives_a_killed_worker():
+    hasher = PasswordHasher(workers=1, max_waiting=10)
+
+    async def scenario():
+        first = await hasher.hash("secret")
+        for process in list(hasher._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        # Both callers find the pool broken; only one replacement is started
+        second, third = await asyncio.gather(hasher.hash("secret"), hasher.hash("secret"))
+        valid, _ = await hasher.verify_and_update("secret", second)
+        return first, second, third, valid
+
+    try:
+        first, second, third, valid = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+    assert first and second and third and valid
+    assert hasher.pool_restarts == 1
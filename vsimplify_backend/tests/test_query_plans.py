@@ -0,0 +1,141 @@
+"""EXPLAIN checks that each paginated list query is served by its index.
+
+Runs against the database in DATABASE_URL, which must be migrated to
+head; skipped when it cannot be reached. Rows are seeded and analyzed
+inside a transaction that is rolled back, so the database is left as
+it was.
+"""
+import json
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from app.config import settings
+from app.models.document import Document
+from app.models.invoice import Invoice, InvoiceDetailEntry
+from app.models.payment import PostingPaymentDetails
+from app.models.supplier import Supplier
+from app.models.user import User, UserRole
+from app.utils.pagination import encode_cursor, page_query
+from app.utils.prefix import starts_with
+
+ROWS = 20000
+
+SEED = [
+    """INSERT INTO document (id, file_name, file_url, status, type, upload_date)
+       SELECT gen_random_uuid(), 'f' || i, '/tmp/f' || i, 's' || i % 50, 't' || i % 50, now() - i * interval '1 minute'
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO invoice (id, category, accounting_type, created_date, invoice_details)
+       SELECT gen_random_uuid(), 'c' || i % 50, 'a' || i % 50, now() - i * interval '1 minute',
+              jsonb_build_array(jsonb_build_object('label', 'GSTIN', 'value', 'G' || lpad(i::text, 6, '0')))
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO posting_payment_details (id, payment_mode, payment_source, ref_no, created_date)
+       SELECT gen_random_uuid(), 'm' || i % 50, 's' || i % 50, 'r' || i, now() - i * interval '1 minute'
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO supplier (id, name, currency_type, gst_status, created_date)
+       SELECT gen_random_uuid(), 'n' || i, 'k' || i % 50, 'g' || i % 50, now() - i * interval '1 minute'
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO users (id, name, email, password, role, created_date)
+       SELECT gen_random_uuid(), 'u' || i, 'u' || i || '@plan.test', 'x',
+              CASE WHEN i % 50 = 7 THEN 'OWNER' ELSE 'ACCOUNTANT' END::userrole, now() - i * interval '1 minute'
+       FROM generate_series(1, :rows) i""",
+]
+ANALYZED = ["document", "invoice", "invoice_detail", "posting_payment_details", "supplier", "users"]
+
+# (name, base query, sort column, id column, index expected to serve it)
+LIST_QUERIES = [
+    ("documents", select(Document), Document.upload_date, Document.id, "ix_document_upload_date_id"),
+    ("documents by status", select(Document).filter(Document.status == "s7"),
+     Document.upload_date, Document.id, "ix_document_status_upload_date_id"),
+    ("documents by type", select(Document).filter(Document.type == "t7"),
+     Document.upload_date, Document.id, "ix_document_type_upload_date_id"),
+    ("invoices", select(Invoice), Invoice.created_date, Invoice.id, "ix_invoice_created_date_id"),
+    ("invoices by category", select(Invoice).filter(Invoice.category == "c7"),
+     Invoice.created_date, Invoice.id, "ix_invoice_category_created_date_id"),
+    ("invoices by accounting type", select(Invoice).filter(Invoice.accounting_type == "a7"),
+     Invoice.created_date, Invoice.id, "ix_invoice_accounting_type_created_date_id"),
+    ("payments", select(PostingPaymentDetails),
+     PostingPaymentDetails.created_date, PostingPaymentDetails.id, "ix_posting_payment_details_created_date_id"),
+    ("payments by mode", select(PostingPaymentDetails).filter(PostingPaymentDetails.payment_mode == "m7"),
+     PostingPaymentDetails.created_date, PostingPaymentDetails.id, "ix_posting_payment_details_mode_created_date_id"),
+    ("payments by source", select(PostingPaymentDetails).filter(PostingPaymentDetails.payment_source == "s7"),
+     PostingPaymentDetails.created_date, PostingPaymentDetails.id, "ix_posting_payment_details_source_created_date_id"),
+    ("suppliers", select(Supplier), Supplier.created_date, Supplier.id, "ix_supplier_created_date_id"),
+    ("suppliers by currency", select(Supplier).filter(Supplier.currency_type == "k7"),
+     Supplier.created_date, Supplier.id, "ix_supplier_currency_type_created_date_id"),
+    ("suppliers by gst status", select(Supplier).filter(Supplier.gst_status == "g7"),
+     Supplier.created_date, Supplier.id, "ix_supplier_gst_status_created_date_id"),
+    ("users", select(User), User.created_date, User.id, "ix_users_created_date_id"),
+    # Owners are few, as in a real company, so the role index pays off
+    ("users by role", select(User).filter(User.role == UserRole.OWNER),
+     User.created_date, User.id, "ix_users_role_created_date_id"),
+]
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(settings.database_url)
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        engine.dispose()
+        pytest.skip("No Postgres at DATABASE_URL")
+    transaction = conn.begin()
+    try:
+        for statement in SEED:
+            conn.execute(text(statement), {"rows": ROWS})
+        for table in ANALYZED:
+            conn.execute(text(f"ANALYZE {table}"))
+        yield conn
+    finally:
+        transaction.rollback()
+        conn.close()
+        engine.dispose()
+
+def _plan(conn, query):
+    compiled = query.compile(dialect=conn.dialect)
+    result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params)
+    plan = result.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+def _index_and_partitions(conn, index_name):
+    # A partitioned table's index is scanned through its partitions' indexes
+    result = conn.execute(text("""
+        WITH RECURSIVE tree(oid) AS (
+            SELECT oid FROM pg_class WHERE relname = :name
+            UNION ALL
+            SELECT inhrelid FROM pg_inherits JOIN tree ON inhparent = tree.oid
+        )
+        SELECT relname FROM pg_class WHERE oid IN (SELECT oid FROM tree)
+    """), {"name": index_name})
+    return set(result.scalars())
+
+def _assert_index_scan(conn, query, index_name):
+    plan = _plan(conn, query)
+    scans = [node for node in _nodes(plan) if "Scan" in node["Node Type"]]
+    indexes = _index_and_partitions(conn, index_name)
+    assert scans and all(
+        node["Node Type"] in ("Index Scan", "Index Only Scan") and node.get("Index Name") in indexes
+        for node in scans
+    ), json.dumps(plan, indent=2)
+
+@pytest.mark.parametrize("name, query, sort_column, id_column, index_name", LIST_QUERIES, ids=[q[0] for q in LIST_QUERIES])
+def test_list_query_uses_index(connection, name, query, sort_column, id_column, index_name):
+    _assert_index_scan(connection, page_query(query, sort_column, id_column, limit=100), index_name)
+
+@pytest.mark.parametrize("name, query, sort_column, id_column, index_name", LIST_QUERIES, ids=[q[0] for q in LIST_QUERIES])
+def test_next_page_query_uses_index(connection, name, query, sort_column, id_column, index_name):
+    # A cursor part-way down the table, as a client paging on would send
+    probe = page_query(query.with_only_columns(sort_column, id_column), sort_column, id_column, skip=100, limit=0)
+    cursor = encode_cursor(*connection.execute(probe).first())
+    _assert_index_scan(connection, page_query(query, sort_column, id_column, limit=100, cursor=cursor), index_name)
+
+def test_invoice_search_uses_detail_index(connection):
+    matches = select(InvoiceDetailEntry.invoice_id).filter(
+        InvoiceDetailEntry.label == "gstin", starts_with(InvoiceDetailEntry.value, "G00012")
+    )
+    plan = _plan(connection, matches)
+    assert any(node.get("Index Name") == "ix_invoice_detail_label_value" for node in _nodes(plan)), json.dumps(plan, indent=2)